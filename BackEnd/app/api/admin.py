@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+from app.db.mongodb import db
+from app.utils.auth import decode_token, is_admin
+from app.utils.profiling import list_traces, get_trace
+from app.utils.parser import PARSER_VERSION
+from app.utils.tenancy import invalidate_scopes
+from app.celery_worker import reprocess_cvs_task
+
+router = APIRouter()
+security = HTTPBearer()
+
+
+def require_admin(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    user_data = decode_token(credentials.credentials)
+    if not user_data:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    if not is_admin(user_data):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user_data
+
+
+@router.get("/admin/profiles")
+def list_profiles(user_data: dict = Depends(require_admin)):
+    """Most recent captured request profiles, newest first"""
+    return list_traces()
+
+
+@router.get("/admin/profiles/{trace_id}")
+def get_profile(trace_id: str, user_data: dict = Depends(require_admin)):
+    trace = get_trace(trace_id)
+    if not trace:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return trace
+
+
+class ReprocessRequest(BaseModel):
+    job: Optional[str] = None
+    statuses: Optional[List[str]] = None
+    # Parsed here so bad dates get a 422 instead of failing inside the worker
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    include_current: bool = False
+    rate: float = 5.0
+
+
+@router.post("/admin/reprocess")
+def start_reprocess(request: ReprocessRequest, user_data: dict = Depends(require_admin)):
+    """Queue a resumable re-parse; reusing a job name resumes its checkpoint"""
+    job = request.job or f"reparse-v{PARSER_VERSION}"
+    reprocess_cvs_task.delay(
+        job,
+        statuses=request.statuses,
+        since=request.since.isoformat() if request.since else None,
+        until=request.until.isoformat() if request.until else None,
+        include_current=request.include_current,
+        rate=request.rate
+    )
+    return {"message": "Reprocessing queued", "job": job, "parser_version": PARSER_VERSION}
+
+
+@router.get("/admin/reprocess/{job}")
+def reprocess_status(job: str, user_data: dict = Depends(require_admin)):
+    checkpoint = db.jobs.find_one({"_id": job})
+    if not checkpoint:
+        raise HTTPException(status_code=404, detail="Job not found")
+    checkpoint["last_id"] = str(checkpoint["last_id"]) if checkpoint.get("last_id") else None
+    return jsonable_encoder(checkpoint)
+
+
+class TeamRequest(BaseModel):
+    team: Optional[str] = None
+
+
+@router.put("/admin/users/{email}/team")
+def set_user_team(email: str, request: TeamRequest, user_data: dict = Depends(require_admin)):
+    """Put a user in a team (sharing one searchable CV pool) or take them out with team=null"""
+    team = request.team.strip() if request.team and request.team.strip() else None
+    update = {"$set": {"team": team}} if team else {"$unset": {"team": ""}}
+    result = db.users.update_one({"email": email}, update)
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="User not found")
+    invalidate_scopes()
+    return {"message": "Team updated", "email": email, "team": team}
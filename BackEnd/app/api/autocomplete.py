@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from typing import Optional
+import time
+
+from app.utils.auth import decode_token
+from app.utils.autocomplete import autocomplete, KINDS, MAX_SUGGESTIONS
+from app.utils.metrics import AUTOCOMPLETE_SECONDS
+
+router = APIRouter()
+security = HTTPBearer()
+
+
+@router.get("/autocomplete")
+def autocomplete_terms(
+    q: str = Query(..., min_length=1, max_length=100, description="Prefix typed so far"),
+    kind: Optional[str] = Query(None, description="Comma-separated kinds: skill, title, company (default all)"),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Query-term suggestions ranked by how many CVs mention them; served from memory"""
+    user_data = decode_token(credentials.credentials)
+    if not user_data:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    kinds = [k.strip() for k in kind.split(",") if k.strip()] if kind else list(KINDS)
+    unknown = [k for k in kinds if k not in KINDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown kinds: {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    suggestions = autocomplete.suggest(q, user_data.get("sub"), kinds, limit)
+    AUTOCOMPLETE_SECONDS.observe(time.perf_counter() - start)
+    return {"query": q, "suggestions": suggestions, "ready": autocomplete.built_at is not None}
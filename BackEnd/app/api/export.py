@@ -0,0 +1,134 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from datetime import datetime
+import csv
+import io
+
+from app.db.mongodb import db
+from app.utils.auth import decode_token
+from app.utils.tenancy import search_scope
+from app.utils.xlsx_stream import stream_xlsx
+from app.utils.search_query import prepare_search, iter_search_matches, mongo_filter
+
+router = APIRouter()
+security = HTTPBearer()
+
+EXPORT_BATCH_SIZE = 500
+CSV_FLUSH_ROWS = 200
+
+
+def _join(values) -> str:
+    return "; ".join(str(v) for v in values or [])
+
+
+def _isoformat(value) -> str:
+    return value.isoformat() if isinstance(value, datetime) else (value or "")
+
+
+# Column name -> value extractor for (cv, match_score)
+EXPORT_COLUMNS = {
+    "cv_id": lambda cv, score: str(cv["_id"]),
+    "name": lambda cv, score: cv.get("name") or "",
+    "email": lambda cv, score: cv.get("email") or "",
+    "phone": lambda cv, score: cv.get("phone") or "",
+    "current_position": lambda cv, score: cv.get("current_position") or "",
+    "current_company": lambda cv, score: cv.get("current_company") or "",
+    "last_education": lambda cv, score: cv.get("last_education") or "",
+    "graduation_batch": lambda cv, score: cv.get("graduation_batch") or "",
+    "total_experience_years": lambda cv, score: cv.get("total_experience_years") if cv.get("total_experience_years") is not None else "",
+    "skills": lambda cv, score: _join(cv.get("skills")),
+    "tags": lambda cv, score: _join(cv.get("tags")),
+    "match_score": lambda cv, score: score,
+    "original_filename": lambda cv, score: cv.get("original_filename") or "",
+    "stored_filename": lambda cv, score: cv.get("stored_filename") or "",
+    "upload_time": lambda cv, score: _isoformat(cv.get("upload_time")),
+}
+DEFAULT_EXPORT_COLUMNS = [
+    "name", "email", "phone", "current_position", "current_company",
+    "last_education", "graduation_batch", "total_experience_years", "skills", "match_score"
+]
+
+# Everything iter_search_matches and the extractors read; skips bulky parse output
+EXPORT_PROJECTION = {
+    "raw_text": 1, "processing_status": 1, "tags": 1, "graduation_batch": 1, "last_education": 1,
+    "upload_time": 1, "skills": 1, "current_position": 1, "current_company": 1, "name": 1,
+    "email": 1, "phone": 1, "original_filename": 1, "stored_filename": 1, "total_experience_years": 1
+}
+
+
+def _iter_rows(plan: dict, columns: list):
+    query = {"processing_status": "completed", **mongo_filter(plan)}
+    cursor = db.cvs.find(query, EXPORT_PROJECTION).batch_size(EXPORT_BATCH_SIZE)
+    try:
+        for cv, score in iter_search_matches(plan, cursor):
+            yield [EXPORT_COLUMNS[column](cv, score) for column in columns]
+    finally:
+        cursor.close()
+
+
+def _stream_csv(plan: dict, columns: list):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 1
+    for row in _iter_rows(plan, columns):
+        writer.writerow(row)
+        pending += 1
+        if pending >= CSV_FLUSH_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+    yield buffer.getvalue()
+
+
+def _stream_xlsx(plan: dict, columns: list):
+    # The sheet is zipped row by row, so the first bytes go out before the search finishes
+    return stream_xlsx(columns, _iter_rows(plan, columns), sheet_name="Candidates", flush_rows=CSV_FLUSH_ROWS)
+
+
+@router.get("/export-cvs")
+def export_cvs(
+    query: str = Query(..., description="Same boolean query syntax as /search-cvs"),
+    format: str = Query("csv", description="csv or xlsx"),
+    columns: Optional[str] = Query(None, description=f"Comma-separated columns from: {', '.join(EXPORT_COLUMNS)}"),
+    tags: Optional[str] = Query(None, description="Comma-separated list of tags to filter by"),
+    batch_min: Optional[int] = Query(None, description="Minimum graduation batch year (1950-2030)"),
+    batch_max: Optional[int] = Query(None, description="Maximum graduation batch year (1950-2030)"),
+    last_education: Optional[str] = Query(None, description="Last education filter (case-insensitive substring match)"),
+    upload_range: Optional[str] = Query(None, description="Upload date range: 1m, 3m, 6m, 1y, 2y, 2y+"),
+    exp_min: Optional[float] = Query(None, ge=0, description="Minimum total experience in years"),
+    exp_max: Optional[float] = Query(None, ge=0, description="Maximum total experience in years"),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Stream matching CVs as CSV/XLSX rows in collection order (not sorted by score)"""
+    token = credentials.credentials
+    user_data = decode_token(token)
+    if not user_data:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    format = format.lower()
+    if format not in ("csv", "xlsx"):
+        raise HTTPException(status_code=400, detail="Format must be csv or xlsx")
+
+    selected = [c.strip() for c in columns.split(",") if c.strip()] if columns else DEFAULT_EXPORT_COLUMNS
+    unknown = [c for c in selected if c not in EXPORT_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(unknown)}")
+
+    plan = prepare_search(
+        query, tags, batch_min, batch_max, last_education, upload_range,
+        search_scope(user_data.get("sub")), exp_min, exp_max
+    )
+    filename = f"cv_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+    if format == "csv":
+        return StreamingResponse(_stream_csv(plan, selected), media_type="text/csv; charset=utf-8", headers=headers)
+    return StreamingResponse(
+        _stream_xlsx(plan, selected),
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers=headers
+    )
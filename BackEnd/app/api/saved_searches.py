@@ -0,0 +1,157 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from app.db.mongodb import db
+from app.utils.auth import decode_token
+from app.utils.percolator import create_saved_search
+
+router = APIRouter()
+security = HTTPBearer()
+
+
+class SavedSearchRequest(BaseModel):
+    name: str
+    query: str
+    tags: Optional[str] = None
+    batch_min: Optional[int] = None
+    batch_max: Optional[int] = None
+    last_education: Optional[str] = None
+    exp_min: Optional[float] = None
+    exp_max: Optional[float] = None
+
+
+class MarkSeenRequest(BaseModel):
+    cv_ids: Optional[List[str]] = None
+
+
+def _current_user(credentials: HTTPAuthorizationCredentials) -> str:
+    user_data = decode_token(credentials.credentials)
+    if not user_data:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return user_data.get("sub")
+
+
+def _owned_search(search_id: str, user_email: str) -> dict:
+    try:
+        saved = db.saved_searches.find_one({"_id": ObjectId(search_id), "user_email": user_email})
+    except InvalidId:
+        saved = None
+    if not saved:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    return saved
+
+
+def _summary(saved: dict) -> dict:
+    return {
+        "id": str(saved["_id"]),
+        "name": saved.get("name"),
+        "query": saved.get("query"),
+        "filters": saved.get("filters") or {},
+        "created_at": saved.get("created_at"),
+        "unseen": db.saved_search_matches.count_documents({"search_id": saved["_id"], "seen": False})
+    }
+
+
+@router.post("/saved-searches")
+def save_search(request: SavedSearchRequest, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Save a search; CVs parsed from now on that match it land in its inbox"""
+    user_email = _current_user(credentials)
+    if not request.query.strip():
+        raise HTTPException(status_code=400, detail="Query must not be empty")
+    saved = create_saved_search(db, user_email, request.name, request.query, request.model_dump())
+    return jsonable_encoder(_summary(saved))
+
+
+@router.get("/saved-searches")
+def list_saved_searches(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    user_email = _current_user(credentials)
+    searches = db.saved_searches.find({"user_email": user_email}).sort("created_at", -1)
+    return jsonable_encoder([_summary(saved) for saved in searches])
+
+
+@router.delete("/saved-searches/{search_id}")
+def delete_saved_search(search_id: str, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    user_email = _current_user(credentials)
+    saved = _owned_search(search_id, user_email)
+    db.saved_searches.delete_one({"_id": saved["_id"]})
+    db.saved_search_matches.delete_many({"search_id": saved["_id"]})
+    return {"message": "Saved search deleted"}
+
+
+@router.get("/saved-searches/{search_id}/inbox")
+def saved_search_inbox(
+    search_id: str,
+    unseen_only: bool = Query(True, description="Only CVs not yet marked as seen"),
+    limit: int = Query(50, ge=1, le=500),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """New CVs matching a saved search, newest first"""
+    user_email = _current_user(credentials)
+    saved = _owned_search(search_id, user_email)
+
+    query = {"search_id": saved["_id"]}
+    if unseen_only:
+        query["seen"] = False
+    matches = list(db.saved_search_matches.find(query).sort("matched_at", -1).limit(limit))
+
+    cvs_by_id = {
+        cv["_id"]: cv
+        for cv in db.cvs.find(
+            {"_id": {"$in": [m["cv_id"] for m in matches]}},
+            {
+                "original_filename": 1, "stored_filename": 1, "thumbnail_filename": 1, "name": 1, "email": 1,
+                "current_position": 1, "current_company": 1, "total_experience_years": 1, "skills": 1, "upload_time": 1
+            }
+        )
+    }
+
+    results = []
+    for match in matches:
+        cv = cvs_by_id.get(match["cv_id"])
+        if not cv:
+            # The CV was deleted after it matched
+            continue
+        results.append({
+            "cv_id": str(cv["_id"]),
+            "match_score": match.get("match_score"),
+            "matched_at": match.get("matched_at"),
+            "seen": match.get("seen", False),
+            "original_filename": cv.get("original_filename"),
+            "stored_filename": cv.get("stored_filename"),
+            "thumbnail_filename": cv.get("thumbnail_filename"),
+            "name": cv.get("name"),
+            "email": cv.get("email"),
+            "current_position": cv.get("current_position"),
+            "current_company": cv.get("current_company"),
+            "total_experience_years": cv.get("total_experience_years"),
+            "skills": cv.get("skills", []),
+            "upload_time": cv.get("upload_time")
+        })
+
+    return jsonable_encoder({"search": _summary(saved), "results": results})
+
+
+@router.post("/saved-searches/{search_id}/inbox/seen")
+def mark_inbox_seen(
+    search_id: str,
+    request: MarkSeenRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Mark the given CVs (or the whole inbox when cv_ids is omitted) as seen"""
+    user_email = _current_user(credentials)
+    saved = _owned_search(search_id, user_email)
+
+    query = {"search_id": saved["_id"], "seen": False}
+    if request.cv_ids is not None:
+        try:
+            query["cv_id"] = {"$in": [ObjectId(cv_id) for cv_id in request.cv_ids]}
+        except InvalidId:
+            raise HTTPException(status_code=400, detail="Invalid CV ID")
+    result = db.saved_search_matches.update_many(query, {"$set": {"seen": True, "seen_at": datetime.utcnow()}})
+    return {"message": "Inbox updated", "marked_seen": result.modified_count}
@@ -1,71 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
-from typing import Optional
-from datetime import datetime, timedelta
-import re
+from typing import List, Optional
+import time
 
 from app.db.mongodb import db
-from app.utils.auth import decode_token
-from app.utils.scorer import compute_match_score
+from app.utils.auth import decode_token, is_admin
+from app.utils.metrics import SEARCH_SECONDS, SEARCH_CANDIDATES
+from app.utils.profiling import profile_request
+from app.utils.tenancy import search_scope
+from app.utils.search_query import prepare_search, mongo_filter, new_filter_stats, iter_search_matches
+from app.utils.responses import ORJSONResponse
+from app.models.search import SearchResponse, DebugCVResponse
 
 router = APIRouter()
 security = HTTPBearer()
 
-def parse_boolean_query(query: str):
-    """Parse boolean query and return keywords and mode"""
-    # Handle quoted phrases
-    quoted_phrases = re.findall(r'"([^"]*)"', query)
-    
-    # Remove quoted phrases from query temporarily
-    temp_query = query
-    for phrase in quoted_phrases:
-        temp_query = temp_query.replace(f'"{phrase}"', '')
-    
-    if ' or ' in temp_query.lower():
-        keywords = [kw.strip().lower() for kw in temp_query.split(' or ') if kw.strip()]
-        mode = 'OR'
-    elif ' and ' in temp_query.lower():
-        keywords = [kw.strip().lower() for kw in temp_query.split(' and ') if kw.strip()]
-        mode = 'AND'
-    else:
-        keywords = [kw.strip().lower() for kw in temp_query.split() if kw.strip()]
-        mode = 'AND'
-    
-    # Add quoted phrases back as single keywords
-    keywords.extend([phrase.lower() for phrase in quoted_phrases])
-    
-    return keywords, mode
-
-def search_in_text(text: str, keywords: list, mode: str) -> bool:
-    """Search for keywords in text with better matching"""
-    if not keywords:
-        return False
-    
-    text_lower = text.lower()
-    
-    if mode == "AND":
-        # All keywords must be present
-        for keyword in keywords:
-            if keyword and keyword not in text_lower:
-                return False
-        return True
-    else:  # OR mode
-        # At least one keyword must be present
-        for keyword in keywords:
-            if keyword and keyword in text_lower:
-                return True
-        return False
-
-@router.get("/search-cvs")
+@router.get("/search-cvs", response_model=SearchResponse, response_class=ORJSONResponse)
 def search_cvs(
-    query: str = Query(..., description="Boolean query: e.g., 'python AND flask' or 'react OR nextjs'"),
+    query: str = Query(..., description="Boolean query: e.g., 'python AND flask' or 'react OR nextjs'; append ~1 or ~2 to a term for typo-tolerant matching"),
     tags: Optional[str] = Query(None, description="Comma-separated list of tags to filter by"),
     batch_min: Optional[int] = Query(None, description="Minimum graduation batch year (1950-2030)"),
     batch_max: Optional[int] = Query(None, description="Maximum graduation batch year (1950-2030)"),
     last_education: Optional[str] = Query(None, description="Last education filter (case-insensitive substring match)"),
     upload_range: Optional[str] = Query(None, description="Upload date range: 1m, 3m, 6m, 1y, 2y, 2y+"),
+    exp_min: Optional[float] = Query(None, ge=0, description="Minimum total experience in years"),
+    exp_max: Optional[float] = Query(None, ge=0, description="Maximum total experience in years"),
+    x_profile: Optional[str] = Header(None, description="Admins only: set to 1 to capture a profile of this search"),
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     token = credentials.credentials
@@ -73,184 +33,113 @@ def search_cvs(
     if not user_data:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    # Parse the search query
-    keywords, mode = parse_boolean_query(query)
-    
-    # Parse tags filter - only apply if explicitly provided and not empty
-    required_tags = []
-    if tags and tags.strip():
-        required_tags = [tag.strip().lower() for tag in tags.split(',') if tag.strip()]
-
-    # Parse upload range filter - only apply if explicitly provided and not empty
-    now = datetime.utcnow()
-    upload_threshold = None
-    upload_comparison = None
-    
-    if upload_range and upload_range.strip():
-        if upload_range == "1m":
-            upload_threshold = now - timedelta(days=30)
-            upload_comparison = "after"
-        elif upload_range == "3m":
-            upload_threshold = now - timedelta(days=90)
-            upload_comparison = "after"
-        elif upload_range == "6m":
-            upload_threshold = now - timedelta(days=180)
-            upload_comparison = "after"
-        elif upload_range == "1y":
-            upload_threshold = now - timedelta(days=365)
-            upload_comparison = "after"
-        elif upload_range == "2y":
-            upload_threshold = now - timedelta(days=730)
-            upload_comparison = "after"
-        elif upload_range == "2y+":
-            upload_threshold = now - timedelta(days=730)
-            upload_comparison = "before"
-
-    results = []
-    total_cvs = 0
-    filtered_cvs = 0
-
-    # Debug: Count total CVs and those that pass each filter
-    filter_stats = {
-        "total_cvs": 0,
-        "completed_processing": 0,
-        "passed_tag_filter": 0,
-        "passed_batch_filter": 0,
-        "passed_education_filter": 0,
-        "passed_upload_filter": 0,
-        "passed_keyword_filter": 0,
-        "final_results": 0
+    # Only the caller's own CVs, or their team's shared pool
+    owners = search_scope(user_data.get("sub"))
+
+    force_profile = x_profile == "1" and is_admin(user_data)
+    params = {
+        "query": query,
+        "tags": tags,
+        "batch_min": batch_min,
+        "batch_max": batch_max,
+        "last_education": last_education,
+        "upload_range": upload_range,
+        "exp_min": exp_min,
+        "exp_max": exp_max
+    }
+    with profile_request("search_cvs", params, user_email=user_data.get("sub"), force=force_profile):
+        return run_search(**params, owners=owners)
+
+def search_result(cv: dict, score: float) -> dict:
+    """One /search-cvs result row (see SearchResult)"""
+    raw_text = cv.get("raw_text") or ""
+    # Include result even if score is 0 for debugging
+    return {
+        "_id": str(cv["_id"]),
+        "user_email": cv.get("user_email"),
+        "original_filename": cv.get("original_filename"),
+        "stored_filename": cv.get("stored_filename"),
+        "thumbnail_filename": cv.get("thumbnail_filename"),
+        "match_score": score,
+        "upload_time": cv.get("upload_time"),
+        "name": cv.get("name"),
+        "email": cv.get("email"),
+        "phone": cv.get("phone"),
+        "skills": cv.get("skills", []),
+        "current_position": cv.get("current_position"),
+        "current_company": cv.get("current_company"),
+        "last_education": cv.get("last_education"),
+        "graduation_batch": cv.get("graduation_batch"),
+        "total_experience_years": cv.get("total_experience_years"),
+        "tags": cv.get("tags", []),
+        # Add debug info
+        "raw_text_preview": raw_text[:200] + "..." if len(raw_text) > 200 else raw_text,
+        "processing_status": cv.get("processing_status")
     }
 
-    for cv in db.cvs.find():
-        filter_stats["total_cvs"] += 1
-        
-        # Check processing status
-        if cv.get("processing_status") != "completed":
-            continue
-        filter_stats["completed_processing"] += 1
-        
-        # Get CV text and metadata
-        raw_text = cv.get("raw_text") or ""
-        cv_tags = [t.lower() for t in cv.get("tags", [])]
-        
-        # Tag filter - only apply if tags are explicitly provided
-        if required_tags:
-            if not all(tag in cv_tags for tag in required_tags):
-                continue
-        filter_stats["passed_tag_filter"] += 1
-
-        # Graduation batch filter - only apply if explicitly provided
-        batch = cv.get("graduation_batch")
-        try:
-            batch = int(batch) if batch else None
-        except (TypeError, ValueError):
-            batch = None
-
-        # Apply reasonable bounds to batch years (1950-2030)
-        if batch is not None and (batch < 1950 or batch > 2030):
-            batch = None
-
-        # Only apply batch filters if they are explicitly set (not None)
-        if batch_min is not None and (batch is None or batch < batch_min):
-            continue
-        if batch_max is not None and (batch is None or batch > batch_max):
-            continue
-        filter_stats["passed_batch_filter"] += 1
+def run_search(
+    query: str,
+    tags: Optional[str] = None,
+    batch_min: Optional[int] = None,
+    batch_max: Optional[int] = None,
+    last_education: Optional[str] = None,
+    upload_range: Optional[str] = None,
+    exp_min: Optional[float] = None,
+    exp_max: Optional[float] = None,
+    owners: Optional[List[str]] = None
+):
+    search_start = time.perf_counter()
 
-        # Last education filter - only apply if explicitly provided and not empty
-        if last_education and last_education.strip():
-            le = (cv.get("last_education") or "").lower()
-            if last_education.lower() not in le:
-                continue
-        filter_stats["passed_education_filter"] += 1
+    plan = prepare_search(query, tags, batch_min, batch_max, last_education, upload_range, owners, exp_min, exp_max)
 
-        # Upload time filter - only apply if explicitly provided and not empty
-        upload_time = cv.get("upload_time")
-        if isinstance(upload_time, str):
-            try:
-                upload_time = datetime.fromisoformat(upload_time.replace('Z', '+00:00'))
-            except ValueError:
-                upload_time = None
+    results = []
 
-        # Only apply upload range filter if it's explicitly set and valid
-        if upload_range and upload_range.strip() and upload_threshold:
-            if upload_comparison == "after":
-                if not upload_time or upload_time < upload_threshold:
-                    continue
-            elif upload_comparison == "before":
-                if upload_time and upload_time > upload_threshold:
-                    continue
-        filter_stats["passed_upload_filter"] += 1
+    # Debug: Count total CVs and those that pass each filter
+    filter_stats = new_filter_stats()
 
-        # Keyword search in raw text
-        if search_in_text(raw_text, keywords, mode):
-            filter_stats["passed_keyword_filter"] += 1
-            
-            # Calculate match score
-            score = compute_match_score(
-                cv_text=raw_text,
-                query=query,
-                skills=cv.get("skills", []),
-                position=cv.get("current_position"),
-                company=cv.get("current_company"),
-                name=cv.get("name"),
-                email=cv.get("email")
-            )
-            
-            # Include result even if score is 0 for debugging
-            result = {
-                "_id": str(cv["_id"]),
-                "user_email": cv.get("user_email"),
-                "original_filename": cv.get("original_filename"),
-                "stored_filename": cv.get("stored_filename"),
-                "match_score": score,
-                "upload_time": cv.get("upload_time"),
-                "name": cv.get("name"),
-                "email": cv.get("email"),
-                "phone": cv.get("phone"),
-                "skills": cv.get("skills", []),
-                "current_position": cv.get("current_position"),
-                "current_company": cv.get("current_company"),
-                "last_education": cv.get("last_education"),
-                "graduation_batch": cv.get("graduation_batch"),
-                "tags": cv.get("tags", []),
-                # Add debug info
-                "raw_text_preview": raw_text[:200] + "..." if len(raw_text) > 200 else raw_text,
-                "processing_status": cv.get("processing_status")
-            }
-            results.append(result)
-            filter_stats["final_results"] += 1
+    for cv, score in iter_search_matches(plan, db.cvs.find(mongo_filter(plan)), filter_stats):
+        results.append(search_result(cv, score))
 
     # Sort by match score (descending)
     results.sort(key=lambda x: x["match_score"], reverse=True)
 
-    return JSONResponse(content=jsonable_encoder({
+    SEARCH_CANDIDATES.observe(filter_stats["total_cvs"], step="scanned")
+    SEARCH_CANDIDATES.observe(filter_stats["passed_keyword_filter"], step="scored")
+    SEARCH_CANDIDATES.observe(filter_stats["final_results"], step="returned")
+    SEARCH_SECONDS.observe(time.perf_counter() - search_start)
+
+    # Rendered straight from the dicts by orjson; SearchResponse documents the shape
+    return ORJSONResponse(content={
         "results": results,
         "search_info": {
             "query": query,
-            "keywords": keywords,
-            "mode": mode,
+            "keywords": plan["keywords"],
+            "mode": plan["mode"],
+            "fuzzy_expansions": plan["fuzzy_expansions"],
             "filters_applied": {
-                "tags": tags if tags and tags.strip() else None,
+                "tags": plan["tags"],
                 "batch_min": batch_min,
                 "batch_max": batch_max,
-                "last_education": last_education if last_education and last_education.strip() else None,
-                "upload_range": upload_range if upload_range and upload_range.strip() else None
+                "last_education": plan["last_education"],
+                "upload_range": plan["upload_range"],
+                "exp_min": exp_min,
+                "exp_max": exp_max
             },
             "active_filters": {
-                "tags_active": bool(required_tags),
+                "tags_active": bool(plan["required_tags"]),
                 "batch_min_active": batch_min is not None,
                 "batch_max_active": batch_max is not None,
-                "education_active": bool(last_education and last_education.strip()),
-                "upload_range_active": bool(upload_range and upload_range.strip() and upload_threshold)
+                "education_active": bool(plan["last_education"]),
+                "upload_range_active": bool(plan["upload_range"] and plan["upload_threshold"]),
+                "exp_min_active": exp_min is not None,
+                "exp_max_active": exp_max is not None
             }
         },
         "filter_stats": filter_stats
-    }))
+    })
 
 # Additional debug endpoint
-@router.get("/debug-cv/{cv_id}")
+@router.get("/debug-cv/{cv_id}", response_model=DebugCVResponse, response_class=ORJSONResponse)
 def debug_cv(
     cv_id: str,
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -263,11 +152,11 @@ def debug_cv(
 
     from bson import ObjectId
     try:
-        cv = db.cvs.find_one({"_id": ObjectId(cv_id)})
+        cv = db.cvs.find_one({"_id": ObjectId(cv_id), "user_email": {"$in": search_scope(user_data.get("sub"))}})
         if not cv:
             raise HTTPException(status_code=404, detail="CV not found")
         
-        return JSONResponse(content=jsonable_encoder({
+        return ORJSONResponse(content={
             "cv_id": cv_id,
             "processing_status": cv.get("processing_status"),
             "raw_text": cv.get("raw_text"),
@@ -279,6 +168,6 @@ def debug_cv(
             "last_education": cv.get("last_education"),
             "upload_time": cv.get("upload_time"),
             "user_email": cv.get("user_email")
-        }))
+        })
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid CV ID: {str(e)}")
\ No newline at end of file
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, Form
+from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, Form, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
+from starlette.concurrency import run_in_threadpool
 from uuid import uuid4
 import zipfile
 from tempfile import TemporaryDirectory
 import os
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
 from datetime import datetime
 from bson import ObjectId
 from typing import Optional
@@ -17,7 +20,14 @@ from app.utils.parser import (
     parse_cv_enhanced
 )
 from app.db.mongodb import db
-from app.celery_worker import parse_cv_task
+from app.utils.search_index import search_index
+from app.utils.dedup import find_duplicate_clusters
+from app.utils.thumbnails import thumbnail_path, render_thumbnail, remove_thumbnails
+from app.utils.index_sync import record_deletion
+from app.utils.tenancy import search_scope
+from app.utils.ingest_queue import (
+    interactive_retry_after, bulk_retry_after, enqueue_interactive, dispatch_bulk_work
+)
 
 router = APIRouter()
 security = HTTPBearer()
@@ -25,6 +35,49 @@ security = HTTPBearer()
 UPLOAD_DIR = "uploaded_cvs"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Stored files only change when a CV is replaced, which the ETag catches on revalidation
+FILE_CACHE_CONTROL = "private, max-age=3600"
+THUMBNAIL_CACHE_CONTROL = "private, max-age=86400"
+
+
+def ensure_admitted(retry_after: Optional[int]):
+    """429 with Retry-After when the parse queues are over their limits"""
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many CVs are waiting to be processed, please retry shortly.",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+def cached_file_response(request: Request, path: str, media_type: str, cache_control: str, filename: Optional[str] = None):
+    """FileResponse with ETag/Last-Modified validators that answers conditional GETs with 304.
+
+    Byte-range requests (Range / If-Range) are handled by Starlette's FileResponse.
+    """
+    stat = os.stat(path)
+    etag = '"' + hashlib.md5(f"{stat.st_mtime}-{stat.st_size}".encode()).hexdigest() + '"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": cache_control
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match:
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if etag in candidates or "*" in candidates:
+            return Response(status_code=304, headers=headers)
+    elif if_modified_since:
+        try:
+            if int(stat.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp():
+                return Response(status_code=304, headers=headers)
+        except (TypeError, ValueError):
+            pass
+
+    return FileResponse(path, media_type=media_type, filename=filename, headers=headers, stat_result=stat)
+
 
 @router.post("/upload-cv")
 async def upload_cv(
@@ -48,6 +101,8 @@ async def upload_cv(
     if file.size and file.size > 10 * 1024 * 1024:
         raise HTTPException(status_code=400, detail="File size too large. Maximum 10MB allowed")
 
+    ensure_admitted(interactive_retry_after(user_email))
+
     original_name = file.filename
     ext = os.path.splitext(original_name)[-1]
     temp_filename = f"temp_{uuid4().hex}{ext}"
@@ -86,7 +141,9 @@ async def upload_cv(
                 old_path = os.path.join(UPLOAD_DIR, old_file)
                 if os.path.exists(old_path):
                     os.remove(old_path)
+                remove_thumbnails(old_path)
             db.cvs.delete_one({"_id": existing_cv["_id"]})
+            record_deletion(db, existing_cv["_id"])
 
         # Final filename after resolving conflicts
         final_filename = original_name
@@ -118,7 +175,9 @@ async def upload_cv(
             "file_size": file.size,
             "file_type": final_filename.split(".")[-1].lower(),
             "upload_time": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
             "processing_status": "uploaded",
+            "ingest": "interactive",
             "tags": tags_list,
             "name": name,
             "email": email,
@@ -128,7 +187,7 @@ async def upload_cv(
         cv_id = str(result.inserted_id)
 
         # Start background parse
-        parse_cv_task.delay(str(cv_id), final_path, original_name)
+        enqueue_interactive(str(cv_id), final_path, original_name, user_email)
 
         return {
             "message": "CV uploaded successfully (duplicate replaced if found).",
@@ -165,12 +224,52 @@ def list_user_cvs(credentials: HTTPAuthorizationCredentials = Depends(security))
     return result
 
 
+@router.get("/duplicate-cvs")
+def list_duplicate_cvs(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    token = credentials.credentials
+    user_data = decode_token(token)
+    if not user_data:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    user_email = user_data.get("sub")
+
+    clusters = find_duplicate_clusters(db.cvs, user_email)
+
+    cv_ids = [ObjectId(cv_id) for cluster in clusters for cv_id in cluster]
+    cvs_by_id = {
+        str(cv["_id"]): cv
+        for cv in db.cvs.find(
+            {"_id": {"$in": cv_ids}},
+            {"original_filename": 1, "stored_filename": 1, "upload_time": 1, "name": 1, "email": 1}
+        )
+    }
+
+    result = []
+    for cluster in clusters:
+        members = []
+        for cv_id in cluster:
+            cv = cvs_by_id.get(cv_id)
+            if not cv:
+                continue
+            members.append({
+                "id": cv_id,
+                "filename": cv.get("original_filename"),
+                "stored_filename": cv.get("stored_filename"),
+                "uploaded_at": cv.get("upload_time").isoformat() if cv.get("upload_time") else None,
+                "name": cv.get("name"),
+                "email": cv.get("email")
+            })
+        if len(members) > 1:
+            result.append({"size": len(members), "cvs": members})
+
+    return result
+
+
 @router.get("/cv/download/{filename}")
-def download_cv(filename: str):
+def download_cv(filename: str, request: Request):
     path = os.path.join(UPLOAD_DIR, filename)
     if not os.path.exists(path):
         raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(path, media_type="application/octet-stream", filename=filename)
+    return cached_file_response(request, path, "application/octet-stream", FILE_CACHE_CONTROL, filename=filename)
 
 
 @router.delete("/cv/{cv_id}")
@@ -199,10 +298,15 @@ async def delete_cv(
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="CV not found")
 
+        search_index.remove_document(cv_id)
+        record_deletion(db, cv_id)
+        db.saved_search_matches.delete_many({"cv_id": ObjectId(cv_id)})
+
         if cv_data.get("stored_filename"):
             file_path = os.path.join(UPLOAD_DIR, cv_data["stored_filename"])
             if os.path.exists(file_path):
                 os.remove(file_path)
+            remove_thumbnails(file_path)
 
         return {
             "message": "CV deleted successfully",
@@ -217,12 +321,51 @@ async def delete_cv(
         raise HTTPException(status_code=500, detail=f"Error deleting CV: {str(e)}")
 
 @router.get("/cv/preview/{filename}")
-def preview_cv(filename: str):
+def preview_cv(filename: str, request: Request):
     path = os.path.join(UPLOAD_DIR, filename)
     if not os.path.exists(path):
         raise HTTPException(status_code=404, detail="File not found")
 
-    return FileResponse(path, media_type="application/pdf")
+    return cached_file_response(request, path, "application/pdf", FILE_CACHE_CONTROL)
+
+@router.get("/cv/thumbnail/{filename}")
+async def thumbnail_cv(
+    filename: str,
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """First-page thumbnail of a stored CV; WebP when the client accepts it, else PNG"""
+    token = credentials.credentials
+    user_data = decode_token(token)
+    if not user_data:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    # Same pool a user can search and open CVs from; other tenants' files look missing
+    owners = search_scope(user_data.get("sub"))
+    if not db.cvs.find_one({"stored_filename": filename, "user_email": {"$in": owners}}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    path = os.path.join(UPLOAD_DIR, filename)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    png_path = thumbnail_path(path, "png")
+    if not os.path.exists(png_path):
+        # CVs uploaded before thumbnails existed are rendered on first request
+        try:
+            png_path = await run_in_threadpool(render_thumbnail, path)
+        except Exception:
+            png_path = None
+        if not png_path:
+            raise HTTPException(status_code=404, detail="Thumbnail not available")
+
+    webp_path = thumbnail_path(path, "webp")
+    if "image/webp" in request.headers.get("accept", "") and os.path.exists(webp_path):
+        response = cached_file_response(request, webp_path, "image/webp", THUMBNAIL_CACHE_CONTROL)
+    else:
+        response = cached_file_response(request, png_path, "image/png", THUMBNAIL_CACHE_CONTROL)
+    response.headers["Vary"] = "Accept"
+    return response
 
 @router.get("/cv-status/{cv_id}")
 def cv_status(cv_id: str, credentials: HTTPAuthorizationCredentials = Depends(security)):
@@ -250,6 +393,8 @@ async def upload_zip(
     if not file.filename.endswith(".zip"):
         raise HTTPException(status_code=400, detail="Only ZIP files are allowed.")
 
+    ensure_admitted(bulk_retry_after(user_email))
+
     temp_dir = TemporaryDirectory()
     try:
         zip_path = os.path.join(temp_dir.name, file.filename)
@@ -276,22 +421,26 @@ async def upload_zip(
                         "file_size": os.path.getsize(dst_path),
                         "file_type": orig_name.split(".")[-1].lower(),
                         "upload_time": datetime.utcnow(),
-                        "processing_status": "uploaded",
+                        "updated_at": datetime.utcnow(),
+                        # Parked until dispatch_bulk_work feeds it to the bulk queue
+                        "processing_status": "queued",
+                        "ingest": "bulk",
                         "tags": []
                     }
                     result = db.cvs.insert_one(db_entry)
                     cv_id = str(result.inserted_id)
 
-                    parse_cv_task.delay(cv_id, dst_path, orig_name)
                     uploaded_cvs.append({
                         "cv_id": cv_id,
                         "original_filename": orig_name,
-                        "status": "uploaded"
+                        "status": "queued"
                     })
 
         if not uploaded_cvs:
             raise HTTPException(status_code=400, detail="No valid CV files found in ZIP.")
 
+        dispatch_bulk_work()
+
         return {
             "message": f"{len(uploaded_cvs)} CVs uploaded from ZIP.",
             "uploaded": uploaded_cvs
@@ -1,48 +1,114 @@
 import os
+from datetime import datetime
 from dotenv import load_dotenv
 load_dotenv()
 
 from celery import Celery
-from app.utils.parser import extract_text_from_pdf, extract_text_from_docx, parse_cv_enhanced
+from kombu import Queue
+from celery.signals import worker_process_init
+from app.utils.parser import extract_text_from_pdf, extract_text_from_docx, parse_cv_enhanced, PARSER_VERSION
 from app.db.mongodb import db
+from app.utils.dedup import index_cv_signature, backfill_signatures
+from app.utils.metrics import STAGE_SECONDS, CV_TASKS, start_metrics_server
+from app.utils.thumbnails import render_thumbnail
+from app.utils.percolator import percolate_cv
 from bson import ObjectId
 
+# Single uploads and ZIP/maintenance work get separate queues (see app/utils/ingest_queue.py)
+INTERACTIVE_QUEUE = 'interactive'
+BULK_QUEUE = 'bulk'
+# Set by reprocess/dispatch_bulk_work on CVs waiting for a re-parse; cleared once it ran
+REPARSE_FIELDS = {'reparse_pending': '', 'reparse_dispatched_at': ''}
+
+# No result backend: nothing reads task results, so they would only accumulate in Redis
 celery_app = Celery(
     'talend',
-    broker='redis://localhost:6379/0',
-    backend='redis://localhost:6379/0'
+    broker=os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+)
+celery_app.conf.update(
+    task_ignore_result=True,
+    # Redeliver a parse if its worker dies mid-task; parse_cv_task is safe to re-run
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # Long tasks: don't let one worker hoard messages others could start on
+    worker_prefetch_multiplier=1,
+    task_default_queue=INTERACTIVE_QUEUE,
+    # A worker started without -Q consumes both, so ZIP imports never sit unconsumed
+    task_queues=(Queue(INTERACTIVE_QUEUE), Queue(BULK_QUEUE)),
+    task_routes={
+        'app.celery_worker.backfill_minhash_task': {'queue': BULK_QUEUE},
+        'app.celery_worker.reprocess_cvs_task': {'queue': BULK_QUEUE},
+        'app.celery_worker.dispatch_bulk_task': {'queue': BULK_QUEUE},
+    },
+    # Safety net for the dispatch chain in parse_cv_task (e.g. after every worker restarted)
+    beat_schedule={
+        'dispatch-bulk-work': {'task': 'app.celery_worker.dispatch_bulk_task', 'schedule': 30.0},
+    }
 )
 
+# Workers don't run the API, so each pool process exposes its own /metrics
+# on the first free port starting at CELERY_METRICS_PORT
+@worker_process_init.connect
+def start_worker_metrics(**kwargs):
+    base_port = os.getenv("CELERY_METRICS_PORT")
+    if not base_port:
+        return
+    for port in range(int(base_port), int(base_port) + 64):
+        try:
+            start_metrics_server(port)
+            return
+        except OSError:
+            continue
+
 @celery_app.task
-def parse_cv_task(cv_id, file_path, original_name):
+def parse_cv_task(cv_id, file_path, original_name, bulk=False):
     try:
         ext = file_path.split('.')[-1].lower()
-        if ext == 'pdf':
-            extracted_text = extract_text_from_pdf(file_path)
-        elif ext == 'docx':
-            extracted_text = extract_text_from_docx(file_path)
-        else:
+        with STAGE_SECONDS.time(stage='extract_text'):
+            if ext == 'pdf':
+                extracted_text = extract_text_from_pdf(file_path)
+            elif ext == 'docx':
+                extracted_text = extract_text_from_docx(file_path)
+            else:
+                extracted_text = None
+        if extracted_text is None:
             db.cvs.update_one(
                 {'_id': ObjectId(cv_id)},
-                {'$set': {'processing_status': 'error', 'error': 'Unsupported file format'}}
+                {'$set': {'processing_status': 'error', 'error': 'Unsupported file format', 'updated_at': datetime.utcnow()},
+             '$unset': REPARSE_FIELDS}
             )
+            CV_TASKS.inc(status='error')
             return
 
         if not extracted_text or len(extracted_text.strip()) < 50:
             db.cvs.update_one(
                 {'_id': ObjectId(cv_id)},
-                {'$set': {'processing_status': 'error', 'error': 'Insufficient text extracted'}}
+                {'$set': {'processing_status': 'error', 'error': 'Insufficient text extracted', 'updated_at': datetime.utcnow()},
+             '$unset': REPARSE_FIELDS}
             )
+            CV_TASKS.inc(status='error')
             return
 
-        parsed_data = parse_cv_enhanced(extracted_text, file_name=original_name)
+        with STAGE_SECONDS.time(stage='parse'):
+            parsed_data = parse_cv_enhanced(extracted_text, file_name=original_name)
         update_fields = parsed_data.copy()
 
+        # ✅ Pre-render the first-page thumbnail for result lists (never fails the parse)
+        with STAGE_SECONDS.time(stage='thumbnail'):
+            try:
+                thumbnail = render_thumbnail(file_path)
+            except Exception:
+                thumbnail = None
+        update_fields['thumbnail_filename'] = os.path.basename(thumbnail) if thumbnail else None
+
         # ✅ Add raw_text for search and mark as completed
         update_fields.update({
             'processing_status': 'completed',
             'text_length': len(extracted_text),
-            'raw_text': extracted_text
+            'raw_text': extracted_text,
+            'parser_version': PARSER_VERSION,
+            'error': None,
+            'updated_at': datetime.utcnow()
         })
 
         # ✅ Ensure all required fields are present (avoid KeyErrors later)
@@ -53,10 +119,56 @@ def parse_cv_task(cv_id, file_path, original_name):
             if key not in update_fields:
                 update_fields[key] = None if key != 'skills' else []
 
-        db.cvs.update_one({'_id': ObjectId(cv_id)}, {'$set': update_fields})
+        with STAGE_SECONDS.time(stage='store'):
+            db.cvs.update_one({'_id': ObjectId(cv_id)}, {'$set': update_fields, '$unset': REPARSE_FIELDS})
+
+        # ✅ Record near-duplicates of this CV among the same user's uploads
+        with STAGE_SECONDS.time(stage='dedup'):
+            cv = db.cvs.find_one({'_id': ObjectId(cv_id)}, {'user_email': 1})
+            index_cv_signature(db.cvs, cv_id, extracted_text, cv.get('user_email') if cv else None)
+
+        # ✅ Deliver the CV to the inboxes of saved searches it matches (never fails the parse)
+        with STAGE_SECONDS.time(stage='percolate'):
+            try:
+                percolate_cv(db, cv_id)
+            except Exception as e:
+                print("⚠️ Saved search matching failed:", e)
+        CV_TASKS.inc(status='completed')
 
     except Exception as e:
         db.cvs.update_one(
             {'_id': ObjectId(cv_id)},
-            {'$set': {'processing_status': 'error', 'error': str(e)}}
+            {'$set': {'processing_status': 'error', 'error': str(e), 'updated_at': datetime.utcnow()},
+             '$unset': REPARSE_FIELDS}
         )
+        CV_TASKS.inc(status='error')
+
+    finally:
+        # Each finished bulk parse tops the bulk queue back up from the parked ZIP imports
+        if bulk:
+            dispatch_bulk_task()
+
+
+@celery_app.task
+def dispatch_bulk_task():
+    from app.utils.ingest_queue import dispatch_bulk_work
+    return dispatch_bulk_work()
+
+
+@celery_app.task
+def backfill_minhash_task():
+    return backfill_signatures(db.cvs)
+
+
+@celery_app.task
+def reprocess_cvs_task(job, statuses=None, since=None, until=None, include_current=False, rate=5.0):
+    from app.utils.reprocess import run_reprocess
+    return run_reprocess(
+        job=job,
+        statuses=statuses,
+        since=datetime.fromisoformat(since) if since else None,
+        until=datetime.fromisoformat(until) if until else None,
+        include_current=include_current,
+        mode="celery",
+        rate=rate
+    )
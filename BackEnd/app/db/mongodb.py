@@ -21,5 +21,30 @@ db = client["cvtool"]  # change if your DB has a different name
 try:
     client.admin.command("ping")
     print("✅ Connected to MongoDB Atlas from mongodb.py")
+    # Searches, exports and listings are scoped to the owner's (or team's) CVs
+    db.cvs.create_index([("user_email", 1), ("processing_status", 1)])
+    # Fair bulk dispatch claims each user's oldest queued CV
+    db.cvs.create_index([("processing_status", 1), ("user_email", 1), ("upload_time", 1)])
+    # ...and, once those are gone, their oldest CV flagged for a re-parse
+    db.cvs.create_index(
+        [("reparse_pending", 1), ("user_email", 1), ("upload_time", 1)],
+        partialFilterExpression={"reparse_pending": True}
+    )
+    db.users.create_index("team")
+    # Experience range filters are pushed down into the scoped scan
+    db.cvs.create_index([("user_email", 1), ("total_experience_months", 1)])
+    # LSH band keys are looked up with $in at ingest for near-duplicate detection
+    db.cvs.create_index("lsh_bands")
+    # Replicas without change streams poll updated_at and deletion tombstones
+    db.cvs.create_index("updated_at")
+    # Thumbnail requests resolve the stored file back to its owner
+    db.cvs.create_index("stored_filename")
+    # Saved-search percolation looks candidates up by owner and anchor gram; inbox entries are unique per CV
+    db.saved_searches.create_index([("user_email", 1), ("anchors", 1), ("created_at", 1)])
+    db.saved_searches.create_index([("user_email", 1), ("match_all", 1), ("created_at", 1)])
+    db.saved_searches.create_index([("user_email", 1), ("created_at", -1)])
+    db.saved_search_matches.create_index([("search_id", 1), ("cv_id", 1)], unique=True)
+    db.saved_search_matches.create_index([("search_id", 1), ("seen", 1), ("matched_at", -1)])
+    db.cv_deletions.create_index("deleted_at", expireAfterSeconds=7 * 24 * 3600)
 except Exception as e:
     print("❌ MongoDB connection failed:", e)
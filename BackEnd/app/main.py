@@ -1,10 +1,41 @@
+import os
 from fastapi import FastAPI
-from app.api import auth, upload, search
+from app.api import auth, upload, search, export, metrics, admin, saved_searches, autocomplete
 from fastapi.middleware.cors import CORSMiddleware
-app = FastAPI()
+from app.db.mongodb import db
+from app.utils.search_index import search_index
+from app.utils.index_sync import IndexSynchronizer
+from app.utils.autocomplete import autocomplete as autocomplete_index
+from app.utils.responses import ORJSONResponse
+from app.utils.compression import CompressionMiddleware
+app = FastAPI(default_response_class=ORJSONResponse)
+index_sync = IndexSynchronizer(db, search_index)
+
+@app.on_event("startup")
+def start_index_sync():
+    # With a snapshot directory the index opens from disk and only catches up on recent changes
+    if os.getenv("INDEX_SNAPSHOT_DIR"):
+        search_index.open(os.getenv("INDEX_SNAPSHOT_DIR"))
+    index_sync.start()
+    # Builds in the background; suggestions are empty until the first build finishes
+    autocomplete_index.start(db)
+
+@app.on_event("shutdown")
+def stop_index_sync():
+    index_sync.stop()
+    autocomplete_index.stop()
+
 app.include_router(auth.router)
 app.include_router(upload.router)
 app.include_router(search.router)
+app.include_router(export.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
+app.include_router(saved_searches.router)
+app.include_router(autocomplete.router)
+
+# Search results and listings are large JSON; compressed per Accept-Encoding (br, then gzip)
+app.add_middleware(CompressionMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
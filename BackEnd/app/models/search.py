@@ -0,0 +1,85 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Union
+from datetime import datetime
+
+
+class SearchResult(BaseModel):
+    id: str = Field(alias="_id")
+    user_email: Optional[str] = None
+    original_filename: Optional[str] = None
+    stored_filename: Optional[str] = None
+    thumbnail_filename: Optional[str] = None
+    match_score: float
+    upload_time: Optional[datetime] = None
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    skills: List[str] = []
+    current_position: Optional[str] = None
+    current_company: Optional[str] = None
+    last_education: Optional[str] = None
+    graduation_batch: Optional[Union[str, int]] = None
+    total_experience_years: Optional[float] = None
+    tags: List[str] = []
+    raw_text_preview: str = ""
+    processing_status: Optional[str] = None
+
+
+class SearchFilters(BaseModel):
+    tags: Optional[str] = None
+    batch_min: Optional[int] = None
+    batch_max: Optional[int] = None
+    last_education: Optional[str] = None
+    upload_range: Optional[str] = None
+    exp_min: Optional[float] = None
+    exp_max: Optional[float] = None
+
+
+class ActiveFilters(BaseModel):
+    tags_active: bool
+    batch_min_active: bool
+    batch_max_active: bool
+    education_active: bool
+    upload_range_active: bool
+    exp_min_active: bool
+    exp_max_active: bool
+
+
+class SearchInfo(BaseModel):
+    query: str
+    keywords: List[str]
+    mode: str
+    fuzzy_expansions: Dict[str, List[str]]
+    filters_applied: SearchFilters
+    active_filters: ActiveFilters
+
+
+class FilterStats(BaseModel):
+    total_cvs: int
+    completed_processing: int
+    passed_tag_filter: int
+    passed_batch_filter: int
+    passed_education_filter: int
+    passed_upload_filter: int
+    passed_keyword_filter: int
+    final_results: int
+
+
+class SearchResponse(BaseModel):
+    results: List[SearchResult]
+    search_info: SearchInfo
+    filter_stats: FilterStats
+
+
+class DebugCVResponse(BaseModel):
+    cv_id: str
+    processing_status: Optional[str] = None
+    raw_text: Optional[str] = None
+    name: Optional[str] = None
+    email: Optional[str] = None
+    tags: List[str] = []
+    skills: List[str] = []
+    graduation_batch: Optional[Union[str, int]] = None
+    last_education: Optional[str] = None
+    upload_time: Optional[datetime] = None
+    user_email: Optional[str] = None
@@ -12,6 +12,9 @@ load_dotenv()
 JWT_SECRET = os.getenv("JWT_SECRET")
 ALGORITHM = "HS256"
 
+# Comma-separated emails allowed to use admin endpoints (profiling, maintenance)
+ADMIN_EMAILS = {e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()}
+
 # ❗Fail early if it's not set
 if not JWT_SECRET:
     raise ValueError("JWT_SECRET is not set in the environment variables")
@@ -37,3 +40,6 @@ def decode_token(token: str) -> dict:
         return payload
     except JWTError:
         return {}
+
+def is_admin(user_data: dict) -> bool:
+    return bool(user_data) and (user_data.get("sub") or "").lower() in ADMIN_EMAILS
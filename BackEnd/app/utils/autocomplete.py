@@ -0,0 +1,245 @@
+"""Typeahead suggestions for skills, job titles and companies.
+
+Each vocabulary is compiled into an array-backed prefix trie: every suggestion
+is keyed by its full normalized text and by each later word ("learning" finds
+"Machine Learning"), the keys are sorted so a prefix is a contiguous range, and
+prefixes whose range is too large to rank on the fly carry a precomputed top-k.
+A lookup is therefore a bisect plus at most MAX_SCAN candidates.
+
+Skills and titles come from the checked-in lists, ranked by how many parsed CVs
+mention them. Companies come from each owner's own CVs so that tenants never see
+each other's data. A background thread refreshes counts from MongoDB; requests
+only read the compiled structures.
+"""
+import heapq
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+KINDS = ("skill", "title", "company")
+MAX_SUGGESTIONS = 20
+# Prefix ranges up to this size are ranked per request; larger ones are precomputed
+MAX_SCAN = 256
+# Only index the first few words of an entry; later words rarely start a query
+MAX_WORD_KEYS = 4
+REFRESH_SECONDS = float(os.getenv("AUTOCOMPLETE_REFRESH_SECONDS", "600"))
+
+# Same data directory as parser.py (BackEnd/, override with TALEND_DATA_DIR)
+DATA_DIR = os.getenv("TALEND_DATA_DIR", os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    return _SPACES.sub(" ", (text or "").strip().lower())
+
+
+class Completer:
+    """Ranked prefix lookup over a fixed list of (text, count) entries"""
+
+    def __init__(self, entries: Iterable[Tuple[str, int]]):
+        texts = {}
+        for text, count in entries:
+            key = normalize(text)
+            if not key:
+                continue
+            # Keep the first spelling seen (the canonical list), but the highest count
+            if key not in texts:
+                texts[key] = [text.strip(), count]
+            else:
+                texts[key][1] = max(texts[key][1], count)
+
+        self.texts = [value[0] for value in texts.values()]
+        self.counts = [value[1] for value in texts.values()]
+
+        # Rank 0 is the best suggestion: most frequent, then shortest, then alphabetical
+        by_rank = sorted(range(len(self.texts)), key=lambda i: (-self.counts[i], len(self.texts[i]), self.texts[i]))
+        rank = [0] * len(by_rank)
+        for position, entry in enumerate(by_rank):
+            rank[entry] = position
+
+        # (key, rank) pairs; word keys rank behind every full-text match of equal standing
+        keyed = []
+        for entry, key in enumerate(texts):
+            keyed.append((key, 2 * rank[entry], entry))
+            words = key.split(" ")
+            for start in range(1, min(len(words), MAX_WORD_KEYS)):
+                keyed.append((" ".join(words[start:]), 2 * rank[entry] + 1, entry))
+        keyed.sort()
+        self.keys = [key for key, _, _ in keyed]
+        self.ranks = [r for _, r, _ in keyed]
+        self.entries = [entry for _, _, entry in keyed]
+        self.top = self._precompute_top()
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def _precompute_top(self) -> Dict[str, List[int]]:
+        """Top suggestions (key positions) for every prefix whose range exceeds MAX_SCAN"""
+        top = {}
+        length = 1
+        # Prefixes of length L are contiguous groups; stop once no group is too big to scan
+        while True:
+            groups = defaultdict(list)
+            for position, key in enumerate(self.keys):
+                if len(key) >= length:
+                    groups[key[:length]].append(position)
+            large = {prefix: positions for prefix, positions in groups.items() if len(positions) > MAX_SCAN}
+            if not large:
+                return top
+            for prefix, positions in large.items():
+                top[prefix] = self._best(positions, MAX_SUGGESTIONS * 4)
+            length += 1
+
+    def _best(self, positions: Iterable[int], limit: int) -> List[int]:
+        # Over-fetch so an entry reached through several keys still fills `limit` slots
+        best, seen = [], set()
+        for position in heapq.nsmallest(limit * 2, positions, key=self.ranks.__getitem__):
+            entry = self.entries[position]
+            if entry not in seen:
+                seen.add(entry)
+                best.append(position)
+            if len(best) >= limit:
+                break
+        return best
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Tuple[int, str, int]]:
+        """(rank, text, count) for the best entries starting with prefix"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        if prefix in self.top:
+            positions = self.top[prefix]
+        else:
+            start = bisect_left(self.keys, prefix)
+            end = bisect_left(self.keys, prefix + "\uffff", start)
+            positions = self._best(range(start, end), limit)
+        results, seen = [], set()
+        for position in positions:
+            entry = self.entries[position]
+            if entry in seen:
+                continue
+            seen.add(entry)
+            results.append((self.ranks[position], self.texts[entry], self.counts[entry]))
+            if len(results) >= limit:
+                break
+        return results
+
+
+def _load_list(filename: str) -> List[str]:
+    # The skills list is saved with a UTF-8 BOM
+    with open(os.path.join(DATA_DIR, filename), encoding="utf-8-sig") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def _field_counts(collection, field: str, unwind: bool = False, by_owner: bool = False) -> List[Dict]:
+    pipeline = [{"$match": {"processing_status": "completed", field: {"$nin": [None, ""]}}}]
+    if unwind:
+        pipeline.append({"$unwind": f"${field}"})
+    group_id = {"value": f"${field}"}
+    if by_owner:
+        group_id["owner"] = "$user_email"
+    pipeline.append({"$group": {"_id": group_id, "count": {"$sum": 1}}})
+    return list(collection.aggregate(pipeline, allowDiskUse=True))
+
+
+class Autocomplete:
+    """Holds the compiled completers; swapped wholesale on refresh so reads need no lock"""
+
+    def __init__(self):
+        self.skills: Optional[Completer] = None
+        self.titles: Optional[Completer] = None
+        self.companies: Dict[str, Completer] = {}
+        self.scopes: Dict[str, List[str]] = {}
+        self.built_at: Optional[float] = None
+        self._skill_list = None
+        self._title_list = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def build(self, db):
+        """Recompile every completer from the static lists and current CV counts"""
+        if self._skill_list is None:
+            self._skill_list = _load_list("LINKEDIN_SKILLS_ORIGINAL.txt")
+            self._title_list = _load_list("titles_combined.txt")
+
+        skill_counts = defaultdict(int)
+        for row in _field_counts(db.cvs, "skills", unwind=True):
+            if isinstance(row["_id"].get("value"), str):
+                skill_counts[normalize(row["_id"]["value"])] += row["count"]
+        title_counts = defaultdict(int)
+        for row in _field_counts(db.cvs, "current_position"):
+            if isinstance(row["_id"].get("value"), str):
+                title_counts[normalize(row["_id"]["value"])] += row["count"]
+
+        company_rows = defaultdict(list)
+        for row in _field_counts(db.cvs, "current_company", by_owner=True):
+            owner, value = row["_id"].get("owner"), row["_id"].get("value")
+            if owner and isinstance(value, str):
+                company_rows[owner].append((value, row["count"]))
+        companies = {
+            # Most common spelling first so it becomes the displayed one
+            owner: Completer(sorted(rows, key=lambda row: -row[1]))
+            for owner, rows in company_rows.items()
+        }
+
+        # Team pools (see tenancy.py), resolved here so requests never query users
+        members = defaultdict(list)
+        for user in db.users.find({"team": {"$exists": True, "$ne": None}}, {"email": 1, "team": 1}):
+            members[user["team"]].append(user["email"])
+        scopes = {email: sorted(emails) for emails in members.values() for email in emails}
+
+        skills = Completer((skill, skill_counts.get(normalize(skill), 0)) for skill in self._skill_list)
+        titles = Completer((title, title_counts.get(normalize(title), 0)) for title in self._title_list)
+
+        self.skills, self.titles, self.companies, self.scopes = skills, titles, companies, scopes
+        self.built_at = time.time()
+        print(f"✅ Autocomplete built: {len(skills)} skills, {len(titles)} titles, {len(companies)} company lists")
+
+    def suggest(self, prefix: str, user_email: str, kinds: Iterable[str] = KINDS, limit: int = 10) -> List[Dict]:
+        """Suggestions across kinds, merged by rank within each kind's frequency order"""
+        candidates = []
+        if "skill" in kinds and self.skills is not None:
+            candidates += [(rank, text, count, "skill") for rank, text, count in self.skills.suggest(prefix, limit)]
+        if "title" in kinds and self.titles is not None:
+            candidates += [(rank, text, count, "title") for rank, text, count in self.titles.suggest(prefix, limit)]
+        if "company" in kinds:
+            seen = set()
+            for owner in self.scopes.get(user_email, [user_email]):
+                completer = self.companies.get(owner)
+                if completer is None:
+                    continue
+                for rank, text, count in completer.suggest(prefix, limit):
+                    if normalize(text) not in seen:
+                        seen.add(normalize(text))
+                        candidates.append((rank, text, count, "company"))
+
+        # Counts are comparable across kinds (CVs mentioning the value); same tie-break as Completer
+        candidates.sort(key=lambda c: (-c[2], len(c[1]), c[1]))
+        return [{"text": text, "kind": kind, "count": count} for _, text, count, kind in candidates[:limit]]
+
+    def start(self, db, interval: float = REFRESH_SECONDS):
+        if self._thread is not None:
+            return
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.build(db)
+                except Exception as e:
+                    print("❌ Autocomplete build failed:", e)
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=run, name="autocomplete-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+# Shared per-process instance used by the autocomplete endpoint
+autocomplete = Autocomplete()
@@ -0,0 +1,153 @@
+"""Negotiated brotli/gzip compression for API payloads.
+
+Only textual API content types are compressed: PDFs, images and XLSX are already
+compressed, and compressing file downloads would break their Range/ETag handling.
+Brotli is used when the client accepts it and the `brotli` package is installed.
+"""
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/csv", "text/plain", "text/html")
+
+
+def accepted_encodings(header: str) -> dict:
+    """Accept-Encoding as {coding: q}"""
+    encodings = {}
+    for item in header.split(","):
+        parts = [p.strip() for p in item.split(";")]
+        if not parts[0]:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        encodings[parts[0].lower()] = q
+    return encodings
+
+
+class _Responder:
+    """Buffers http.response.start until the first body chunk decides whether to compress.
+
+    Self-contained rather than built on Starlette's GZipMiddleware responders, which
+    are internal and whose hooks change between releases. A response is passed
+    through untouched when it is partial (206), already encoded, not an allowlisted
+    type, or a single chunk under minimum_size.
+    """
+
+    content_encoding = ""
+
+    def __init__(self, app: ASGIApp, minimum_size: int) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.initial_message: Message = {}
+        self.passthrough = False
+        self.started = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_with_compression)
+
+    def compress(self, body: bytes, *, more_body: bool) -> bytes:
+        return body
+
+    async def send_with_compression(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                message["status"] == 206
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            )
+            if self.passthrough:
+                await self.send(message)
+        elif message_type != "http.response.body" or self.passthrough:
+            if not self.passthrough and not self.started:
+                # e.g. http.response.pathsend: nothing to compress, release the headers as they are
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+        elif not self.started:
+            self.started = True
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if len(body) < self.minimum_size and not more_body:
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if self.content_encoding:
+                message["body"] = self.compress(body, more_body=more_body)
+                headers["Content-Encoding"] = self.content_encoding
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(message["body"]))
+            await self.send(self.initial_message)
+            await self.send(message)
+        else:
+            message["body"] = self.compress(message.get("body", b""), more_body=message.get("more_body", False))
+            await self.send(message)
+
+
+class _GZipResponder(_Responder):
+    content_encoding = "gzip"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, level: int) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, body: bytes, *, more_body: bool) -> bytes:
+        data = self.compressor.compress(body)
+        return data + self.compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+
+class _BrotliResponder(_Responder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=quality)
+
+    def compress(self, body: bytes, *, more_body: bool) -> bytes:
+        data = self.compressor.process(body)
+        return data + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+class CompressionMiddleware:
+    """Follows Starlette's GZipMiddleware behaviour, plus brotli and a content-type allowlist"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = accepted_encodings(Headers(scope=scope).get("Accept-Encoding", ""))
+        if brotli is not None and accepted.get("br", 0) > 0:
+            responder = _BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif accepted.get("gzip", 0) > 0:
+            responder = _GZipResponder(self.app, self.minimum_size, self.gzip_level)
+        else:
+            # Still adds Vary so caches keep compressed and identity bodies apart
+            responder = _Responder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
@@ -0,0 +1,126 @@
+import hashlib
+import random
+import struct
+import zlib
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+
+from app.utils.search_index import tokenize
+
+# 128 permutations split into 16 bands of 8 rows: pairs above ~0.7 Jaccard
+# almost always share a band, pairs below ~0.4 almost never do
+NUM_PERM = 128
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+SHINGLE_SIZE = 3
+DUPLICATE_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_rng = random.Random(20250601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    tokens = tokenize(text)
+    if len(tokens) < size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def compute_minhash(text: str) -> List[int]:
+    hashes = [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(text)]
+    if not hashes:
+        return [_MAX_HASH] * NUM_PERM
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def lsh_band_keys(signature: List[int]) -> List[str]:
+    keys = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        digest = hashlib.md5(struct.pack(f"<{len(rows)}I", *rows)).hexdigest()[:16]
+        keys.append(f"{band}:{digest}")
+    return keys
+
+
+def estimate_similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    if not sig_a or not sig_b or len(sig_a) != len(sig_b):
+        return 0.0
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def index_cv_signature(collection, cv_id: str, raw_text: str, user_email: Optional[str]) -> List[Dict]:
+    """Store the CV's MinHash/LSH keys and record the near-duplicates found through the band index"""
+    signature = compute_minhash(raw_text)
+    band_keys = lsh_band_keys(signature)
+
+    candidate_query = {"_id": {"$ne": ObjectId(cv_id)}, "lsh_bands": {"$in": band_keys}}
+    if user_email:
+        candidate_query["user_email"] = user_email
+
+    near_duplicates = []
+    for candidate in collection.find(candidate_query, {"minhash": 1}):
+        similarity = estimate_similarity(signature, candidate.get("minhash"))
+        if similarity >= DUPLICATE_THRESHOLD:
+            near_duplicates.append({"cv_id": str(candidate["_id"]), "similarity": round(similarity, 3)})
+
+    collection.update_one(
+        {"_id": ObjectId(cv_id)},
+        {"$set": {"minhash": signature, "lsh_bands": band_keys, "near_duplicates": near_duplicates}}
+    )
+    return near_duplicates
+
+
+def find_duplicate_clusters(collection, user_email: str) -> List[List[str]]:
+    """Group a user's CVs into clusters of near-duplicates (union-find over recorded pairs)"""
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(a, b):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_b] = root_a
+
+    query = {"user_email": user_email, "near_duplicates.0": {"$exists": True}}
+    for cv in collection.find(query, {"near_duplicates": 1}):
+        cv_id = str(cv["_id"])
+        for duplicate in cv.get("near_duplicates", []):
+            union(cv_id, duplicate["cv_id"])
+
+    clusters = {}
+    for cv_id in parent:
+        clusters.setdefault(find(cv_id), []).append(cv_id)
+    return [sorted(members) for members in clusters.values() if len(members) > 1]
+
+
+def backfill_signatures(collection, batch_size: int = 500) -> int:
+    """Compute signatures for completed CVs that predate near-duplicate detection"""
+    query = {"processing_status": "completed", "minhash": {"$exists": False}}
+    projection = {"raw_text": 1, "user_email": 1}
+    processed = 0
+    for cv in collection.find(query, projection).sort("_id", 1).batch_size(batch_size):
+        index_cv_signature(collection, str(cv["_id"]), cv.get("raw_text") or "", cv.get("user_email"))
+        processed += 1
+    return processed
+
+
+if __name__ == "__main__":
+    from app.db.mongodb import db
+
+    count = backfill_signatures(db.cvs)
+    print(f"✅ Backfilled MinHash signatures for {count} CVs")
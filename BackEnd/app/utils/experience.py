@@ -0,0 +1,186 @@
+"""Normalizes total work experience into whole months so it can be range-filtered.
+
+Gemini's stated "Total_Experience" is free text ("5+ years", "2 yrs 6 months",
+"Fresher") and is used when it parses. Otherwise the employment sections of the
+CV are scanned for date ranges ("Jan 2019 - Present", "03/2016 – 08/2018",
+"2014 to 2017"), which are merged so overlapping jobs are not double-counted.
+"""
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Anything above this is a parse error rather than a career
+MAX_EXPERIENCE_MONTHS = 50 * 12
+EARLIEST_YEAR = 1960
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12
+}
+
+EXPERIENCE_HEADING = re.compile(
+    r"^\s*(work experience|professional experience|experience|employment history|employment|"
+    r"work history|career history|professional background)\s*:?\s*$",
+    re.IGNORECASE
+)
+OTHER_HEADING = re.compile(
+    r"^\s*(education|academic.*|qualifications?|skills|technical skills|key skills|projects?|personal projects|"
+    r"certifications?|achievements?|awards?|publications?|languages?|interests|hobbies|references|"
+    r"personal details|personal information|summary|profile|objective|internships?|training|"
+    r"extra[- ]curricular.*|volunteering|declaration)\s*:?\s*$",
+    re.IGNORECASE
+)
+
+_MONTH_NAME = (
+    r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+)
+_DATE = (
+    rf"(?:{_MONTH_NAME}\.?,?\s*'?(?:\d{{4}}|\d{{2}})\b"
+    r"|\d{1,2}[/.-]\d{4}"
+    r"|(?:19|20)\d{2})"
+)
+_OPEN_END = r"(?:present|current(?:ly)?|now|today|till date|to date|ongoing)"
+DATE_RANGE = re.compile(
+    rf"\b({_DATE})\s*(?:-|–|—|to|till|until)\s*({_DATE}|{_OPEN_END})",
+    re.IGNORECASE
+)
+
+_STATED_YEARS = re.compile(r"(\d+(?:\.\d+)?)\s*\+?\s*(?:years?|yrs?|y)\b")
+_STATED_MONTHS = re.compile(r"(\d+)\s*\+?\s*(?:months?|mos?|m)\b")
+_PLAIN_NUMBER = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*\+?\s*$")
+_NO_EXPERIENCE = re.compile(r"\b(fresher|no experience|entry[- ]level|none)\b")
+
+
+def parse_stated_experience(value) -> Optional[int]:
+    """Months of experience from a stated value like 4, "3.5", "5+ years" or "2 yrs 6 months" """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        months = round(value * 12)
+    else:
+        text = str(value).strip().lower()
+        if not text:
+            return None
+        if _NO_EXPERIENCE.search(text):
+            return 0
+        years = _STATED_YEARS.search(text)
+        months_match = _STATED_MONTHS.search(text)
+        plain = _PLAIN_NUMBER.match(text)
+        if not years and not months_match and not plain:
+            return None
+        if plain:
+            months = round(float(plain.group(1)) * 12)
+        else:
+            months = round(float(years.group(1)) * 12) if years else 0
+            months += int(months_match.group(1)) if months_match else 0
+    return months if 0 <= months <= MAX_EXPERIENCE_MONTHS else None
+
+
+def _month_index(value: str, is_end: bool, now: datetime) -> Optional[int]:
+    """Absolute month number (year * 12 + month - 1); ends are exclusive"""
+    value = value.strip().lower()
+    if re.fullmatch(_OPEN_END, value):
+        return now.year * 12 + now.month
+
+    numeric = re.fullmatch(r"(\d{1,2})[/.-](\d{4})", value)
+    named = re.fullmatch(rf"({_MONTH_NAME})\.?,?\s*'?(\d{{4}}|\d{{2}})", value)
+    if numeric:
+        month, year = int(numeric.group(1)), int(numeric.group(2))
+        if not 1 <= month <= 12:
+            return None
+    elif named:
+        month, year = MONTHS[named.group(1)[:3]], int(named.group(2))
+        if year < 100:
+            year += 2000 if year <= now.year % 100 else 1900
+    elif re.fullmatch(r"\d{4}", value):
+        # A bare year counts from January, so "2015 - 2018" is three years
+        return int(value) * 12
+    else:
+        return None
+
+    if year < EARLIEST_YEAR:
+        return None
+    return year * 12 + month - 1 + (1 if is_end else 0)
+
+
+def employment_sections(text: str) -> List[str]:
+    """Lines under experience-style headings, up to the next unrelated heading"""
+    sections = []
+    current = None
+    for line in (text or "").splitlines():
+        stripped = line.strip()
+        if len(stripped) <= 40 and EXPERIENCE_HEADING.match(stripped):
+            current = []
+            sections.append(current)
+        elif len(stripped) <= 40 and OTHER_HEADING.match(stripped):
+            current = None
+        elif current is not None:
+            current.append(line)
+    return ["\n".join(lines) for lines in sections]
+
+
+def employment_date_ranges(text: str, now: Optional[datetime] = None) -> List[Tuple[int, int]]:
+    now = now or datetime.utcnow()
+    latest = now.year * 12 + now.month
+    ranges = []
+    for section in employment_sections(text):
+        for start_text, end_text in DATE_RANGE.findall(section):
+            start = _month_index(start_text, False, now)
+            end = _month_index(end_text, True, now)
+            if start is None or end is None:
+                continue
+            end = min(end, latest)
+            if 0 < end - start <= MAX_EXPERIENCE_MONTHS:
+                ranges.append((start, end))
+    return ranges
+
+
+def months_from_date_ranges(text: str, now: Optional[datetime] = None) -> Optional[int]:
+    """Total months covered by employment date ranges, counting overlaps once"""
+    ranges = sorted(employment_date_ranges(text, now))
+    if not ranges:
+        return None
+    total = 0
+    current_start, current_end = ranges[0]
+    for start, end in ranges[1:]:
+        if start <= current_end:
+            current_end = max(current_end, end)
+        else:
+            total += current_end - current_start
+            current_start, current_end = start, end
+    total += current_end - current_start
+    return min(total, MAX_EXPERIENCE_MONTHS)
+
+
+def normalize_experience(stated, text: str, now: Optional[datetime] = None) -> Dict:
+    """Fields stored on the CV: total_experience_months/years and where they came from"""
+    months = parse_stated_experience(stated)
+    source = "stated" if months is not None else None
+    if months is None:
+        months = months_from_date_ranges(text, now)
+        source = "date_ranges" if months is not None else None
+    return {
+        "total_experience_months": months,
+        "total_experience_years": round(months / 12, 1) if months is not None else None,
+        "experience_source": source
+    }
+
+
+def backfill_experience(collection, batch_size: int = 500) -> int:
+    """Normalize experience on completed CVs parsed before it was numeric, without calling Gemini"""
+    query = {"processing_status": "completed", "experience_source": {"$exists": False}}
+    projection = {"raw_text": 1, "total_experience_years": 1}
+    processed = 0
+    for cv in collection.find(query, projection).sort("_id", 1).batch_size(batch_size):
+        fields = normalize_experience(cv.get("total_experience_years"), cv.get("raw_text") or "")
+        collection.update_one({"_id": cv["_id"]}, {"$set": {**fields, "updated_at": datetime.utcnow()}})
+        processed += 1
+    return processed
+
+
+if __name__ == "__main__":
+    from app.db.mongodb import db
+
+    count = backfill_experience(db.cvs)
+    print(f"✅ Normalized experience for {count} CVs")
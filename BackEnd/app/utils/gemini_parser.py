@@ -4,6 +4,8 @@ import re
 import requests
 from dotenv import load_dotenv
 
+from app.utils.metrics import GEMINI_CALLS, GEMINI_FAILURES, GEMINI_TOKENS
+
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
@@ -47,6 +49,7 @@ Resume text:
         ]
     }
 
+    GEMINI_CALLS.inc()
     try:
         response = requests.post(
             f"{endpoint}?key={GEMINI_API_KEY}",
@@ -57,6 +60,10 @@ Resume text:
         result = response.json()
         print("GEMINI RAW RESPONSE:", json.dumps(result, indent=2))
 
+        usage = result.get("usageMetadata") or {}
+        GEMINI_TOKENS.inc(usage.get("promptTokenCount", 0), kind="prompt")
+        GEMINI_TOKENS.inc(usage.get("candidatesTokenCount", 0), kind="completion")
+
         candidates = result.get("candidates")
         if not candidates or "content" not in candidates[0]:
             raise ValueError("Missing 'candidates' or 'content' in response.")
@@ -78,6 +85,7 @@ Resume text:
 
     except Exception as e:
         print("Gemini parsing failed:", e)
+        GEMINI_FAILURES.inc()
         return {
             "name": None,
             "current_company": None,
@@ -0,0 +1,393 @@
+"""On-disk, memory-mapped snapshots of the search index plus an append-only delta log.
+
+Snapshot layout (native byte order, every section 8-byte aligned):
+
+    MAGIC (6s) | FORMAT_VERSION (H) | header length (I) | header JSON
+    doc_ids        12-byte ObjectIds sorted by (owner, id); a document's number is its position
+    doc_order      u32 doc numbers in ObjectId order, for id -> number lookups
+    owner_offsets  u32 (owner_count + 1); owner i's documents are numbers [off[i], off[i + 1])
+    meta_batch     int16 per doc (0 = unknown)
+    meta_upload    int64 per doc, epoch seconds (0 = unknown)
+    meta_tags      u32 offsets (doc_count + 1) | u32 tag ids (names in the header)
+    terms          u32 offsets (term_count + 1) | utf-8 blob, sorted
+    postings       u32 offsets (term_count + 1) | u32 doc numbers
+    delete_keys    u32 offsets | utf-8 blob, sorted (SymSpell deletion keys of term prefixes)
+    delete_terms   u32 offsets | u32 term numbers
+
+Readers binary-search the mmap directly, so opening a snapshot costs a header
+parse no matter how large the corpus is. Because documents are numbered by owner
+and postings are sorted, one owner's hits for a term are a contiguous slice. Changes made after the snapshot are
+appended to a JSON-lines delta log and replayed on load.
+
+Several API worker processes may point at the same INDEX_SNAPSHOT_DIR. Each one
+claims its own `worker-N/` subdirectory by holding an exclusive fcntl.flock on
+`worker-N.lock` for as long as it runs, so log appends, rotation and compaction
+never race another process; a restarted worker reclaims a free slot and resumes
+from that slot's snapshot. Sharing one snapshot between processes would need a
+single compacting writer plus reload signalling, which is not worth it while every
+process already keeps its own in-memory index.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so the directory is assumed to have one user
+    fcntl = None
+
+MAGIC = b"TLSNAP"
+FORMAT_VERSION = 3
+_PREFIX = struct.Struct("<6sHI")
+_ALIGN = 8
+_EMPTY = memoryview(array("I"))
+
+
+def snapshot_path(directory: str) -> str:
+    return os.path.join(directory, f"search_index.v{FORMAT_VERSION}.snap")
+
+
+def delta_log_path(directory: str) -> str:
+    # Versioned with the snapshot: a log only makes sense on top of the snapshot it followed
+    return os.path.join(directory, f"search_index.v{FORMAT_VERSION}.delta.log")
+
+
+def claim_slot(directory: str):
+    """Lock the first free worker-N slot in directory; returns (slot directory, open lock file).
+
+    The lock lasts until the returned file is closed or the process exits.
+    """
+    os.makedirs(directory, exist_ok=True)
+    slot = 0
+    while True:
+        lock_file = open(os.path.join(directory, f"worker-{slot}.lock"), "a")
+        if fcntl is None:
+            break
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            break
+        except BlockingIOError:
+            lock_file.close()
+            slot += 1
+    slot_dir = os.path.join(directory, f"worker-{slot}")
+    os.makedirs(slot_dir, exist_ok=True)
+    return slot_dir, lock_file
+
+
+def stale_files(directory: str) -> List[str]:
+    """Snapshots and delta logs left behind by other format versions"""
+    current = {
+        os.path.basename(snapshot_path(directory)),
+        os.path.basename(delta_log_path(directory)),
+        os.path.basename(delta_log_path(directory)) + ".compacting",
+    }
+    return [
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.startswith("search_index.") and not name.endswith(".tmp") and name not in current
+    ]
+
+
+def _pad(length: int) -> int:
+    return (-length) % _ALIGN
+
+
+class _StringTable:
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return max(0, len(self.offsets) - 1)
+
+    def key(self, i: int) -> bytes:
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]])
+
+    def find(self, key: bytes) -> int:
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current = self.key(mid)
+            if current < key:
+                lo = mid + 1
+            elif current > key:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+
+class _U32Lists:
+    def __init__(self, offsets: memoryview, values: memoryview):
+        self.offsets = offsets
+        self.values = values
+
+    def get(self, i: int) -> memoryview:
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+
+class IndexSnapshot:
+    """Read-only view over a snapshot file; all lookups read straight from the mmap"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        if len(self._mmap) < _PREFIX.size:
+            raise ValueError(f"{path} is truncated")
+        magic, version, header_length = _PREFIX.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a search index snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version {version}")
+        self.header = json.loads(bytes(self._view[_PREFIX.size:_PREFIX.size + header_length]))
+        if self.header["byteorder"] != sys.byteorder:
+            raise ValueError("Snapshot was written on a machine with a different byte order")
+
+        self.doc_count = self.header["doc_count"]
+        self.term_count = self.header["term_count"]
+        self.tags = self.header["tags"]
+        self.owners = self.header["owners"]
+        self._owner_numbers = {owner: i for i, owner in enumerate(self.owners)}
+        self._doc_ids = self._section("doc_ids")
+        self._doc_order = self._section("doc_order").cast("I")
+        self._owner_offsets = self._section("owner_offsets").cast("I")
+        self._batch = self._section("meta_batch").cast("h")
+        self._upload = self._section("meta_upload").cast("q")
+        self._tags = _U32Lists(self._section("meta_tag_offsets").cast("I"), self._section("meta_tag_ids").cast("I"))
+        self._terms = _StringTable(self._section("term_offsets").cast("I"), self._section("term_blob"))
+        self._postings = _U32Lists(self._section("posting_offsets").cast("I"), self._section("postings").cast("I"))
+        self._delete_keys = _StringTable(self._section("delete_key_offsets").cast("I"), self._section("delete_key_blob"))
+        self._delete_terms = _U32Lists(self._section("delete_term_offsets").cast("I"), self._section("delete_terms").cast("I"))
+
+    def _section(self, name: str) -> memoryview:
+        offset, length = self.header["sections"][name]
+        return self._view[offset:offset + length]
+
+    def close(self):
+        try:
+            self._view.release()
+            self._mmap.close()
+        except BufferError:
+            # Views handed out to in-flight lookups keep the map alive; GC will close it
+            pass
+
+    def doc_id(self, number: int) -> str:
+        return bytes(self._doc_ids[number * 12:(number + 1) * 12]).hex()
+
+    def doc_number(self, cv_id: str) -> int:
+        try:
+            key = bytes.fromhex(cv_id)
+        except ValueError:
+            return -1
+        lo, hi = 0, self.doc_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            number = self._doc_order[mid]
+            current = bytes(self._doc_ids[number * 12:(number + 1) * 12])
+            if current < key:
+                lo = mid + 1
+            elif current > key:
+                hi = mid
+            else:
+                return number
+        return -1
+
+    def owner_range(self, owner: str) -> tuple:
+        """Doc numbers [lo, hi) belonging to owner"""
+        i = self._owner_numbers.get(owner or "")
+        if i is None:
+            return 0, 0
+        return self._owner_offsets[i], self._owner_offsets[i + 1]
+
+    def owner_of(self, number: int) -> str:
+        lo, hi = 0, len(self.owners)
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self._owner_offsets[mid] <= number:
+                lo = mid
+            else:
+                hi = mid
+        return self.owners[lo]
+
+    def doc_ids(self) -> Iterator[str]:
+        for number in range(self.doc_count):
+            yield self.doc_id(number)
+
+    def meta(self, number: int) -> Dict:
+        return {
+            "batch": self._batch[number] or None,
+            "upload_time": self._upload[number] or None,
+            "tags": [self.tags[t] for t in self._tags.get(number)],
+            "owner": self.owner_of(number) or None,
+        }
+
+    def term(self, number: int) -> str:
+        return self._terms.key(number).decode("utf-8")
+
+    def term_number(self, term: str) -> int:
+        return self._terms.find(term.encode("utf-8"))
+
+    def postings(self, term: str) -> memoryview:
+        number = self.term_number(term)
+        return self._postings.get(number) if number >= 0 else _EMPTY
+
+    def postings_at(self, number: int) -> memoryview:
+        return self._postings.get(number)
+
+    def deletes(self, key: str) -> List[str]:
+        number = self._delete_keys.find(key.encode("utf-8"))
+        if number < 0:
+            return []
+        return [self.term(t) for t in self._delete_terms.get(number)]
+
+
+def _string_table(strings: List[str]):
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = array("I", [0])
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return offsets.tobytes(), b"".join(encoded)
+
+
+def _u32_lists(lists: Iterable) -> tuple:
+    offsets = array("I", [0])
+    chunks = []
+    for values in lists:
+        values = np.asarray(values, dtype=np.uint32)
+        offsets.append(offsets[-1] + len(values))
+        chunks.append(values.tobytes())
+    return offsets.tobytes(), b"".join(chunks)
+
+
+def snapshot_order(cv_id: str, meta: Dict) -> tuple:
+    """Sort key for snapshot documents: grouped by owner, then by ObjectId"""
+    return (meta.get("owner") or "", bytes.fromhex(cv_id))
+
+
+def write_snapshot(
+    path: str,
+    doc_ids: List[str],
+    metas: List[Dict],
+    postings: Dict[str, np.ndarray],
+    deletes: Dict[str, List[int]],
+    extra_header: Optional[Dict] = None
+):
+    """Write a snapshot atomically. doc_ids must be sorted by (owner, ObjectId bytes)
+    (see snapshot_order) and postings/deletes must reference positions in
+    doc_ids / sorted(postings)."""
+    terms = sorted(postings)
+    owners = [meta.get("owner") or "" for meta in metas]
+    owner_names = sorted(set(owners))
+    owner_offsets = array("I")
+    for number, owner in enumerate(owners):
+        if not owner_offsets or owner != owners[number - 1]:
+            owner_offsets.append(number)
+    owner_offsets.append(len(owners))
+    id_order = sorted(range(len(doc_ids)), key=lambda number: bytes.fromhex(doc_ids[number]))
+    tag_names = sorted({tag for meta in metas for tag in meta.get("tags") or []})
+    tag_ids = {tag: i for i, tag in enumerate(tag_names)}
+
+    sections = {
+        "doc_ids": b"".join(bytes.fromhex(cv_id) for cv_id in doc_ids),
+        "doc_order": array("I", id_order).tobytes(),
+        "owner_offsets": owner_offsets.tobytes(),
+        "meta_batch": array("h", [meta.get("batch") or 0 for meta in metas]).tobytes(),
+        "meta_upload": array("q", [int(meta.get("upload_time") or 0) for meta in metas]).tobytes(),
+    }
+    sections["meta_tag_offsets"], sections["meta_tag_ids"] = _u32_lists(
+        [tag_ids[tag] for tag in meta.get("tags") or []] for meta in metas
+    )
+    sections["term_offsets"], sections["term_blob"] = _string_table(terms)
+    sections["posting_offsets"], sections["postings"] = _u32_lists(postings[term] for term in terms)
+    delete_keys = sorted(deletes)
+    sections["delete_key_offsets"], sections["delete_key_blob"] = _string_table(delete_keys)
+    sections["delete_term_offsets"], sections["delete_terms"] = _u32_lists(deletes[key] for key in delete_keys)
+
+    header = {
+        "byteorder": sys.byteorder,
+        "created_at": datetime.utcnow().isoformat(),
+        "doc_count": len(doc_ids),
+        "term_count": len(terms),
+        "tags": tag_names,
+        "owners": owner_names,
+        **(extra_header or {}),
+    }
+
+    # Section offsets depend on the header length, so lay out with a generous fixed reservation
+    layout = {}
+    header["sections"] = layout
+    reserved = len(json.dumps(header)) + 64 * len(sections) + 256
+    offset = _PREFIX.size + reserved + _pad(_PREFIX.size + reserved)
+    for name, data in sections.items():
+        layout[name] = [offset, len(data)]
+        offset += len(data) + _pad(len(data))
+    header_bytes = json.dumps(header).encode("utf-8")
+    if len(header_bytes) > reserved:
+        raise ValueError("Snapshot header exceeded its reserved space")
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, data in sections.items():
+            f.write(b"\0" * (layout[name][0] - f.tell()))
+            f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class DeltaLog:
+    """Append-only JSON-lines log of index mutations since the last snapshot"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self.entries = 0
+
+    def append(self, entry: Dict):
+        self._file.write(json.dumps(entry, default=str) + "\n")
+        self._file.flush()
+        self.entries += 1
+
+    def rotate(self) -> str:
+        """Move the current log aside (to be folded into a snapshot) and start a new one"""
+        self._file.close()
+        rotated = f"{self.path}.compacting"
+        if os.path.exists(rotated):
+            # Leftover from an interrupted compaction: keep its entries ahead of ours
+            with open(rotated, "a", encoding="utf-8") as out, open(self.path, encoding="utf-8") as current:
+                out.write(current.read())
+            os.remove(self.path)
+        else:
+            os.replace(self.path, rotated)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self.entries = 0
+        return rotated
+
+    def close(self):
+        self._file.close()
+
+
+def read_log(path: str) -> Iterator[Dict]:
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # A torn final write after a crash; everything before it is intact
+                break
@@ -0,0 +1,170 @@
+"""Keeps each API replica's in-memory search index in step with db.cvs.
+
+Tails a MongoDB change stream on `cvs` (replica sets / Atlas) and falls back to
+polling an `updated_at` watermark plus `cv_deletions` tombstones where change
+streams are unavailable (standalone or local stand-ins). The resume token /
+watermark lives on the index, so a restored index continues from where it
+left off instead of rebuilding.
+"""
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.utils.search_index import SearchIndex, document_meta, WATERMARK_OVERLAP
+
+# auto (change stream, falling back to polling), change_stream, poll or off
+INDEX_SYNC_MODE = os.getenv("INDEX_SYNC_MODE", "auto")
+INDEX_SYNC_POLL_SECONDS = float(os.getenv("INDEX_SYNC_POLL_SECONDS", "2"))
+
+# Only these fields change what the index holds for a CV
+INDEXED_FIELDS = ("raw_text", "processing_status", "graduation_batch", "upload_time", "tags", "user_email")
+SYNC_PROJECTION = {field: 1 for field in INDEXED_FIELDS + ("updated_at",)}
+
+# ChangeStreamHistoryLost / ChangeStreamFatalError
+RESUME_TOKEN_LOST_CODES = (286, 280)
+
+
+def record_deletion(db, cv_id: str):
+    """Tombstone a deleted CV so polling replicas can drop it from their index"""
+    db.cv_deletions.insert_one({"cv_id": str(cv_id), "deleted_at": datetime.utcnow()})
+
+
+class IndexSynchronizer:
+    def __init__(self, db, index: SearchIndex, mode: str = INDEX_SYNC_MODE, poll_interval: float = INDEX_SYNC_POLL_SECONDS):
+        self.db = db
+        self.collection = db.cvs
+        self.index = index
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # cv_id -> updated_at already applied by polling; CVs inside WATERMARK_OVERLAP
+        # come back on every poll and are skipped unless they changed again
+        self._polled: Dict[str, datetime] = {}
+
+    def start(self):
+        if self.mode == "off" or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="index-sync", daemon=True)
+        self.index.sync_thread = self._thread
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                if self.mode in ("auto", "change_stream"):
+                    self._tail_change_stream()
+                else:
+                    self._poll_forever()
+                backoff = 1
+            except OperationFailure as e:
+                if e.code in RESUME_TOKEN_LOST_CODES:
+                    # Oplog rolled past our token: start over from a fresh build
+                    print("⚠️ Change stream resume token expired, rebuilding search index")
+                    self.index.resume_token = None
+                    self.index.ready = False
+                    continue
+                # Code 40573: change streams need a replica set
+                if self.mode == "auto":
+                    print("⚠️ Change streams unavailable, polling updated_at instead:", e)
+                    self.mode = "poll"
+                    continue
+                print("❌ Index sync failed:", e)
+            except PyMongoError as e:
+                print("❌ Index sync failed:", e)
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, 60)
+
+    def rebuild(self):
+        """Reload every completed CV; everything written after `started` is replayed by polling"""
+        started = datetime.utcnow()
+        self.index.clear()
+        self._polled.clear()
+        watermark = started - WATERMARK_OVERLAP
+        for cv in self.collection.find({"processing_status": "completed"}, SYNC_PROJECTION).batch_size(500):
+            self.index.add_document(str(cv["_id"]), cv.get("raw_text") or "", document_meta(cv))
+            if cv.get("updated_at") and cv["updated_at"] >= watermark:
+                self._polled[str(cv["_id"])] = cv["updated_at"]
+        self.index.checkpoint(watermark=watermark)
+        self.index.ready = True
+        # Persist straight away so the next start opens the snapshot instead of repeating this
+        self.index.compact()
+
+    def apply_document(self, cv_id: str, cv: Optional[dict]):
+        if cv and cv.get("processing_status") == "completed":
+            self.index.add_document(cv_id, cv.get("raw_text") or "", document_meta(cv))
+        else:
+            self.index.remove_document(cv_id)
+
+    def apply_change(self, change: dict):
+        operation = change["operationType"]
+        if operation in ("drop", "rename", "dropDatabase", "invalidate"):
+            self.index.resume_token = None
+            self.rebuild()
+            return
+
+        cv_id = str(change["documentKey"]["_id"])
+        if operation == "delete":
+            self.index.remove_document(cv_id)
+        elif operation == "update":
+            updated = change.get("updateDescription", {})
+            touched = set(updated.get("updatedFields", {})) | set(updated.get("removedFields", []))
+            if touched & set(INDEXED_FIELDS):
+                self.apply_document(cv_id, change.get("fullDocument"))
+        elif operation in ("insert", "replace"):
+            self.apply_document(cv_id, change.get("fullDocument"))
+
+    def _tail_change_stream(self):
+        # Open the stream before any rebuild so no change slips between the two
+        with self.collection.watch(
+            full_document="updateLookup",
+            resume_after=self.index.resume_token
+        ) as stream:
+            if not self.index.ready:
+                self.rebuild()
+            while not self._stop.is_set() and stream.alive:
+                change = stream.try_next()
+                if change is None:
+                    self.index.checkpoint(resume_token=stream.resume_token)
+                    self.index.maybe_compact()
+                    self._stop.wait(0.5)
+                    continue
+                self.apply_change(change)
+                self.index.checkpoint(resume_token=stream.resume_token)
+
+    def poll_once(self):
+        """Apply writes and deletions newer than the index watermark"""
+        if not self.index.ready:
+            self.rebuild()
+        since = self.index.watermark
+        polled_at = datetime.utcnow()
+
+        for cv in self.collection.find({"updated_at": {"$gte": since}}, SYNC_PROJECTION).sort("updated_at", 1):
+            cv_id = str(cv["_id"])
+            if self._polled.get(cv_id) == cv.get("updated_at"):
+                continue
+            self.apply_document(cv_id, cv)
+            self._polled[cv_id] = cv.get("updated_at")
+        for tombstone in self.db.cv_deletions.find({"deleted_at": {"$gte": since}}):
+            self.index.remove_document(tombstone["cv_id"])
+
+        watermark = polled_at - WATERMARK_OVERLAP
+        # Older entries can no longer match the next poll's query
+        self._polled = {cv_id: updated for cv_id, updated in self._polled.items() if updated >= watermark}
+        self.index.checkpoint(watermark=watermark)
+        self.index.maybe_compact()
+
+    def _poll_forever(self):
+        while not self._stop.is_set():
+            self.poll_once()
+            self._stop.wait(self.poll_interval)
@@ -0,0 +1,145 @@
+"""Admission control and fair dispatch for CV parsing.
+
+Single uploads go straight onto the `interactive` queue. ZIP imports are parked
+in Mongo as `queued` CVs and fed onto the `bulk` queue a few at a time,
+round-robin across users, so one large import can neither starve another
+user's import nor bury interactive parses. Completed CVs picked for a re-parse
+(see reprocess) stay `completed` and searchable with `reparse_pending` set, and
+are fed onto the bulk queue the same way once the user has no `queued` CVs left.
+When queues are past their limits uploads are refused with a Retry-After hint
+instead of piling up in Redis.
+
+A plain `celery -A app.celery_worker worker` consumes both queues. In
+production, run at least one worker on the interactive queue alone so bulk
+work never delays it:
+    celery -A app.celery_worker worker -Q interactive
+    celery -A app.celery_worker worker -Q interactive,bulk
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.celery_worker import celery_app, parse_cv_task, INTERACTIVE_QUEUE, BULK_QUEUE
+from app.db.mongodb import db
+from app.utils.tenancy import tenant_queue
+
+UPLOAD_DIR = "uploaded_cvs"
+
+# Refuse single uploads once this many parses are waiting, or a user has this many in flight
+INTERACTIVE_MAX_DEPTH = int(os.getenv("INTERACTIVE_MAX_DEPTH", "200"))
+INTERACTIVE_MAX_PER_USER = int(os.getenv("INTERACTIVE_MAX_PER_USER", "20"))
+# Bulk tasks kept on the broker at once; the rest wait in Mongo as `queued`
+BULK_QUEUE_TARGET = int(os.getenv("BULK_QUEUE_TARGET", "50"))
+# Refuse new ZIP imports from a user with this many CVs still waiting
+BULK_MAX_PENDING_PER_USER = int(os.getenv("BULK_MAX_PENDING_PER_USER", "5000"))
+RETRY_AFTER_SECONDS = int(os.getenv("INGEST_RETRY_AFTER", "30"))
+# A CV still `uploaded` this long after it was queued lost its parse (e.g. a worker crash)
+# and no longer counts as in flight; reprocessing can pick it up again
+STALE_PARSE_SECONDS = int(os.getenv("STALE_PARSE_SECONDS", "900"))
+
+
+def in_flight_cutoff() -> datetime:
+    """CVs `uploaded` (updated_at) since this moment are still being parsed"""
+    return datetime.utcnow() - timedelta(seconds=STALE_PARSE_SECONDS)
+
+
+def reparse_claimable() -> dict:
+    """reparse_pending CVs not yet dispatched, or whose dispatched parse went stale"""
+    return {
+        "reparse_pending": True,
+        "$or": [
+            {"reparse_dispatched_at": {"$exists": False}},
+            {"reparse_dispatched_at": {"$lt": in_flight_cutoff()}}
+        ]
+    }
+
+
+def _claim(user_email: str) -> Optional[dict]:
+    # Claim atomically so concurrent dispatchers never enqueue a CV twice
+    now = datetime.utcnow()
+    projection = {"stored_filename": 1, "original_filename": 1}
+    cv = db.cvs.find_one_and_update(
+        {"user_email": user_email, "processing_status": "queued"},
+        {"$set": {"processing_status": "uploaded", "dispatched_at": now, "updated_at": now}},
+        sort=[("upload_time", 1)],
+        projection=projection
+    )
+    if cv:
+        return cv
+    # Re-parses keep their status (and search visibility); the task clears the flag when done
+    return db.cvs.find_one_and_update(
+        {"user_email": user_email, **reparse_claimable()},
+        {"$set": {"reparse_dispatched_at": now}},
+        sort=[("upload_time", 1)],
+        projection=projection
+    )
+
+
+def queue_depth(queue: str) -> int:
+    """Messages waiting on a broker queue (0 if it does not exist yet)"""
+    try:
+        with celery_app.connection_or_acquire() as conn:
+            return conn.default_channel.queue_declare(queue=queue, passive=True).message_count
+    except Exception:
+        return 0
+
+
+def interactive_retry_after(user_email: str) -> Optional[int]:
+    """Seconds to wait before retrying a single upload, or None to admit it"""
+    in_flight = db.cvs.count_documents({
+        "user_email": user_email,
+        "processing_status": "uploaded",
+        "ingest": "interactive",
+        "updated_at": {"$gte": in_flight_cutoff()}
+    })
+    if in_flight >= INTERACTIVE_MAX_PER_USER:
+        return RETRY_AFTER_SECONDS
+    if queue_depth(INTERACTIVE_QUEUE) >= INTERACTIVE_MAX_DEPTH:
+        return RETRY_AFTER_SECONDS
+    return None
+
+
+def bulk_retry_after(user_email: str) -> Optional[int]:
+    """Seconds to wait before retrying a ZIP import, or None to admit it"""
+    pending = db.cvs.count_documents({"user_email": user_email, "processing_status": "queued"})
+    if pending >= BULK_MAX_PENDING_PER_USER:
+        # Roughly how long the user's backlog needs to drain below the limit
+        return max(RETRY_AFTER_SECONDS, (pending - BULK_MAX_PENDING_PER_USER + 1) * RETRY_AFTER_SECONDS // BULK_QUEUE_TARGET)
+    return None
+
+
+def enqueue_interactive(cv_id: str, file_path: str, original_name: str, user_email: str):
+    parse_cv_task.apply_async(
+        (cv_id, file_path, original_name),
+        queue=tenant_queue(user_email) or INTERACTIVE_QUEUE
+    )
+
+
+def dispatch_bulk_work() -> int:
+    """Move queued and re-parse CVs onto the bulk queue, one user at a time in turn, until it holds BULK_QUEUE_TARGET"""
+    depths = {}
+    users = sorted(
+        set(db.cvs.distinct("user_email", {"processing_status": "queued"}))
+        | set(db.cvs.distinct("user_email", reparse_claimable()))
+    )
+    dispatched = 0
+    while users:
+        for user_email in list(users):
+            queue = tenant_queue(user_email) or BULK_QUEUE
+            if queue not in depths:
+                depths[queue] = queue_depth(queue)
+            if depths[queue] >= BULK_QUEUE_TARGET:
+                users.remove(user_email)
+                continue
+            cv = _claim(user_email)
+            if not cv:
+                users.remove(user_email)
+                continue
+            parse_cv_task.apply_async(
+                (str(cv["_id"]), os.path.join(UPLOAD_DIR, cv["stored_filename"]), cv.get("original_filename")),
+                kwargs={"bulk": True},
+                queue=queue
+            )
+            depths[queue] += 1
+            dispatched += 1
+    return dispatched
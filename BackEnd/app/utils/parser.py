@@ -7,18 +7,31 @@ import os
 import pandas as pd
 import fitz  # pymupdf
 from app.utils.gemini_parser import extract_fields_with_gemini
+from app.utils.metrics import STAGE_SECONDS
+from app.utils.experience import normalize_experience
 
 nlp = spacy.load("en_core_web_sm")
 
-# Load external datasets
-NAMES_DF = pd.read_csv('C:/Users/tanay/Desktop/Data/College/Summer25/TalEnd/BackEnd/paired_full_names.csv', nrows=50000)
-FIRST_NAMES_SET = set(NAMES_DF['First Name'].dropna().str.lower())
-LAST_NAMES_SET = set(NAMES_DF['Last Name'].dropna().str.lower())
+# Bump whenever parsing output changes so reprocess.py re-derives stale CVs
+PARSER_VERSION = 3
+
+# Data files live in BackEnd/ (override with TALEND_DATA_DIR)
+DATA_DIR = os.getenv("TALEND_DATA_DIR", os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-with open('C:/Users/tanay/Desktop/Data/College/Summer25/TalEnd/BackEnd/LINKEDIN_SKILLS_ORIGINAL.txt', encoding='utf-8') as f:
+# Load external datasets
+NAMES_PATH = os.path.join(DATA_DIR, 'paired_full_names.csv')
+if os.path.exists(NAMES_PATH):
+    NAMES_DF = pd.read_csv(NAMES_PATH, nrows=50000)
+    FIRST_NAMES_SET = set(NAMES_DF['First Name'].dropna().str.lower())
+    LAST_NAMES_SET = set(NAMES_DF['Last Name'].dropna().str.lower())
+else:
+    FIRST_NAMES_SET = set()
+    LAST_NAMES_SET = set()
+
+with open(os.path.join(DATA_DIR, 'LINKEDIN_SKILLS_ORIGINAL.txt'), encoding='utf-8') as f:
     SKILLS_SET = set(line.strip().lower() for line in f if line.strip())
 
-COLLEGE_DF = pd.read_csv('C:/Users/tanay/Desktop/Data/College/Summer25/TalEnd/BackEnd/world-universities.csv', header=None, names=['country', 'college', 'url'])
+COLLEGE_DF = pd.read_csv(os.path.join(DATA_DIR, 'world-universities.csv'), header=None, names=['country', 'college', 'url'])
 COLLEGE_SET = set(COLLEGE_DF['college'].dropna().str.lower())
 
 FORBIDDEN_NAMES = {"chatgpt", "resume", "cv", "profile", "curriculum vitae", "summary", "objective"}
@@ -84,13 +97,20 @@ def extract_education(text: str) -> List[Dict[str, str]]:
 
 
 def parse_cv_enhanced(text: str, file_name: Optional[str] = None) -> dict:
-    doc = nlp(text)
-    emails = extract_emails(text)
-    phones = extract_phone_numbers(text)
-    regex_skills = extract_skills(text)
-    education_entries = extract_education(text)
-
-    gemini_data = extract_fields_with_gemini(text)
+    with STAGE_SECONDS.time(stage="spacy"):
+        doc = nlp(text)
+    with STAGE_SECONDS.time(stage="contacts"):
+        emails = extract_emails(text)
+        phones = extract_phone_numbers(text)
+    with STAGE_SECONDS.time(stage="skills"):
+        regex_skills = extract_skills(text)
+    with STAGE_SECONDS.time(stage="education"):
+        education_entries = extract_education(text)
+
+    with STAGE_SECONDS.time(stage="gemini"):
+        gemini_data = extract_fields_with_gemini(text)
+    with STAGE_SECONDS.time(stage="experience"):
+        experience = normalize_experience(gemini_data.get("Total_Experience"), text)
 
     parsed_data = {
         "name": gemini_data.get("name"),
@@ -99,7 +119,9 @@ def parse_cv_enhanced(text: str, file_name: Optional[str] = None) -> dict:
         "phone": phones[0] if phones else None,
         "phone_numbers": phones,
         "skills": gemini_data.get("skills", []) or regex_skills,
-        "total_experience_years": gemini_data.get("Total Experience"),
+        "total_experience_years": experience["total_experience_years"],
+        "total_experience_months": experience["total_experience_months"],
+        "experience_source": experience["experience_source"],
         "current_company": gemini_data.get("current_company"),
         "current_position": gemini_data.get("current_designation"),
         "education": education_entries,
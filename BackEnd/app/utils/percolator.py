@@ -0,0 +1,159 @@
+"""Reverse matching of newly parsed CVs against users' saved searches.
+
+Search keywords match as substrings of the CV text, so a CV can only satisfy a
+keyword if it contains every 3-character gram of it. Each saved search is
+indexed (multikey `anchors` field) under grams that any matching CV must
+contain: one gram of its most selective keyword for AND queries, one gram per
+keyword for OR queries. A new CV then looks up only the saved searches whose
+anchors occur in its text, and the full query runs against those alone, so the
+work per CV does not grow with the number of saved searches.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from app.utils.search_query import (
+    parse_boolean_query, parse_fuzzy_keyword, prepare_search, iter_search_matches
+)
+from app.utils.search_index import (
+    tokenize, edit_distance, is_fuzzy_eligible, MAX_EDIT_DISTANCE, MIN_FUZZY_TERM_LENGTH
+)
+from app.utils.tenancy import search_scope
+
+GRAM_SIZE = 3
+# English letters from most to least common; grams made of rarer letters match fewer CVs
+_LETTER_COMMONNESS = {letter: rank for rank, letter in enumerate("etaoinsrhldcumfpgwybvkxjqz")}
+
+# Filters stored with a saved search (same meaning as the /search-cvs parameters)
+FILTER_FIELDS = ("tags", "batch_min", "batch_max", "last_education", "exp_min", "exp_max")
+
+
+def _gram_rarity(gram: str) -> int:
+    # Digits and symbols (c++, c#, 2019) are rarer than any letter
+    return sum(_LETTER_COMMONNESS.get(ch, len(_LETTER_COMMONNESS)) for ch in gram)
+
+
+def text_grams(text: str) -> Set[str]:
+    """Grams of the lowercased text that can serve as anchors (no whitespace)"""
+    text = (text or "").lower()
+    return {
+        gram for gram in (text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1))
+        if not any(ch.isspace() for ch in gram)
+    }
+
+
+def keyword_anchor(keyword: str) -> Optional[str]:
+    """The rarest gram of a plain keyword, or None if it cannot be anchored"""
+    if parse_fuzzy_keyword(keyword):
+        return None
+    grams = text_grams(keyword)
+    return max(sorted(grams), key=_gram_rarity) if grams else None
+
+
+def query_anchors(query: str) -> Optional[List[str]]:
+    """Grams any CV matching query must contain at least one of; None = check every CV"""
+    keywords, mode = parse_boolean_query(query)
+    keywords = [k for k in keywords if k]
+    anchors = [keyword_anchor(k) for k in keywords]
+    if not keywords:
+        return None
+    if mode == "AND":
+        usable = [a for a in anchors if a]
+        return [max(usable, key=_gram_rarity)] if usable else None
+    # OR: an unanchorable alternative could match anything
+    return sorted(set(anchors)) if all(anchors) else None
+
+
+def fuzzy_hits_for(cv_id: str, raw_text: str, keywords: List[str]) -> Dict[str, Set[str]]:
+    """Fuzzy keyword hits for a single CV, computed from its own tokens (no shared index)"""
+    hits = {}
+    tokens = None
+    for keyword in keywords:
+        parsed = parse_fuzzy_keyword(keyword)
+        if not parsed:
+            continue
+        if tokens is None:
+            tokens = set(tokenize(raw_text))
+        term, max_distance = parsed
+        max_distance = max(0, min(max_distance, MAX_EDIT_DISTANCE))
+        if len(term) < MIN_FUZZY_TERM_LENGTH:
+            max_distance = 0
+        matched = any(
+            token == term or (is_fuzzy_eligible(token) and edit_distance(term, token, max_distance) <= max_distance)
+            for token in tokens
+        )
+        hits[keyword] = {cv_id} if matched else set()
+    return hits
+
+
+def _within_experience(saved: Dict, cv: Dict) -> bool:
+    filters = saved.get("filters") or {}
+    if filters.get("exp_min") is None and filters.get("exp_max") is None:
+        return True
+    months = cv.get("total_experience_months")
+    if months is None:
+        return False
+    if filters.get("exp_min") is not None and months < round(filters["exp_min"] * 12):
+        return False
+    if filters.get("exp_max") is not None and months > round(filters["exp_max"] * 12):
+        return False
+    return True
+
+
+def create_saved_search(db, user_email: str, name: str, query: str, filters: Dict) -> Dict:
+    anchors = query_anchors(query)
+    saved = {
+        "user_email": user_email,
+        "name": name,
+        "query": query,
+        "filters": {field: filters.get(field) for field in FILTER_FIELDS},
+        "anchors": anchors or [],
+        "match_all": anchors is None,
+        "created_at": datetime.utcnow()
+    }
+    saved["_id"] = db.saved_searches.insert_one(saved).inserted_id
+    return saved
+
+
+def percolate_cv(db, cv_id: str) -> int:
+    """Add a freshly parsed CV to the inbox of every saved search it matches"""
+    cv = db.cvs.find_one({"_id": ObjectId(cv_id)})
+    if not cv or cv.get("processing_status") != "completed":
+        return 0
+    raw_text = cv.get("raw_text") or ""
+    upload_time = cv.get("upload_time") or datetime.utcnow()
+
+    # Only searches whose owner can see this CV; scopes are symmetric (a user or a whole team).
+    # Re-parsed old CVs are not new candidates for searches saved after their upload
+    candidates = db.saved_searches.find({
+        "user_email": {"$in": search_scope(cv.get("user_email"))},
+        "created_at": {"$lte": upload_time},
+        "$or": [{"anchors": {"$in": sorted(text_grams(raw_text))}}, {"match_all": True}]
+    })
+
+    matched = 0
+    for saved in candidates:
+        if not _within_experience(saved, cv):
+            continue
+        filters = saved.get("filters") or {}
+        plan = prepare_search(
+            saved["query"], filters.get("tags"), filters.get("batch_min"), filters.get("batch_max"),
+            filters.get("last_education"), expand_fuzzy=False
+        )
+        plan["fuzzy_hits"] = fuzzy_hits_for(cv_id, raw_text, plan["keywords"])
+        for _, score in iter_search_matches(plan, [cv]):
+            try:
+                db.saved_search_matches.insert_one({
+                    "search_id": saved["_id"],
+                    "user_email": saved["user_email"],
+                    "cv_id": cv["_id"],
+                    "match_score": score,
+                    "matched_at": datetime.utcnow(),
+                    "seen": False
+                })
+                matched += 1
+            except DuplicateKeyError:
+                pass
+    return matched
@@ -0,0 +1,114 @@
+import cProfile
+import os
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+# Fraction of requests profiled in the background (off unless set); a trace is kept
+# only if the request ends up slower than PROFILE_SLOW_MS (or was explicitly requested)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "2000"))
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "50"))
+PROFILE_TOP_FUNCTIONS = 40
+
+# Hot spots reported separately so they are easy to spot in a trace
+FOCUS_FUNCTIONS = {
+    "mongo_cursor": ("pymongo", "cursor.py"),
+    "search_in_text": ("search_query.py", "search_in_text"),
+    "compute_match_score": ("scorer.py", "compute_match_score"),
+}
+
+# Only one cProfile profiler can be active per process (sys.monitoring on 3.12+)
+_profiler_lock = threading.Lock()
+_traces = deque(maxlen=PROFILE_BUFFER_SIZE)
+_traces_lock = threading.Lock()
+
+
+def _function_label(func) -> str:
+    filename, line, name = func
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def _matches_focus(func, markers) -> bool:
+    filename, _, name = func
+    return all(marker in filename or marker == name for marker in markers)
+
+
+def _summarize(profiler: cProfile.Profile) -> Dict:
+    stats = pstats.Stats(profiler)
+    rows = []
+    focus = {key: {"calls": 0, "cumulative_ms": 0.0} for key in FOCUS_FUNCTIONS}
+    for func, (primitive_calls, calls, total_time, cumulative_time, _) in stats.stats.items():
+        rows.append({
+            "function": _function_label(func),
+            "calls": calls,
+            "total_ms": round(total_time * 1000, 3),
+            "cumulative_ms": round(cumulative_time * 1000, 3),
+        })
+        for key, markers in FOCUS_FUNCTIONS.items():
+            if _matches_focus(func, markers):
+                focus[key]["calls"] += calls
+                # Self time for the cursor: its methods call each other, so cumulative double counts
+                spent = total_time if key == "mongo_cursor" else cumulative_time
+                focus[key]["cumulative_ms"] = round(focus[key]["cumulative_ms"] + spent * 1000, 3)
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return {"focus": focus, "top_functions": rows[:PROFILE_TOP_FUNCTIONS]}
+
+
+@contextmanager
+def profile_request(endpoint: str, params: Dict, user_email: Optional[str] = None, force: bool = False):
+    """Profile the block if forced or sampled; keep the trace if forced or slow"""
+    profiler = None
+    if (force or random.random() < PROFILE_SAMPLE_RATE) and _profiler_lock.acquire(blocking=False):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Some other tool (debugger, coverage) already owns the profiling hook
+            _profiler_lock.release()
+            profiler = None
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if profiler is not None:
+            profiler.disable()
+            _profiler_lock.release()
+            if force or elapsed_ms >= PROFILE_SLOW_MS:
+                trace = {
+                    "id": uuid4().hex,
+                    "endpoint": endpoint,
+                    "params": params,
+                    "user_email": user_email,
+                    "captured_at": datetime.utcnow().isoformat(),
+                    "elapsed_ms": round(elapsed_ms, 3),
+                    "reason": "requested" if force else "slow",
+                    **_summarize(profiler),
+                }
+                with _traces_lock:
+                    _traces.append(trace)
+
+
+def list_traces() -> List[Dict]:
+    with _traces_lock:
+        traces = list(_traces)
+    return [
+        {key: trace[key] for key in ("id", "endpoint", "params", "user_email", "captured_at", "elapsed_ms", "reason")}
+        for trace in reversed(traces)
+    ]
+
+
+def get_trace(trace_id: str) -> Optional[Dict]:
+    with _traces_lock:
+        for trace in _traces:
+            if trace["id"] == trace_id:
+                return trace
+    return None
@@ -0,0 +1,251 @@
+"""Resumable re-parse of existing CVs after parser changes.
+
+Walks db.cvs in _id order, re-running parse_cv_task on stale or failed CVs,
+and checkpoints progress in db.jobs so an interrupted run picks up where it
+stopped.
+
+Usage (from BackEnd/):
+    python -m app.utils.reprocess --job reparse-v2 --workers 4
+    python -m app.utils.reprocess --status error uploaded --since 2025-01-01 --mode celery
+"""
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.db.mongodb import db
+from app.utils.parser import PARSER_VERSION
+from app.utils.ingest_queue import dispatch_bulk_work, in_flight_cutoff
+
+UPLOAD_DIR = "uploaded_cvs"
+DEFAULT_CHUNK_SIZE = 100
+DEFAULT_RATE = 5.0  # CVs per second; each re-parse costs one Gemini call and a few Mongo writes
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` acquisitions per second"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = 1.0
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate or self.rate <= 0:
+            return
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(max(self.rate, 1.0), self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                time.sleep((1 - self.tokens) / self.rate)
+
+
+def in_flight_filters() -> List[Dict]:
+    return [
+        {"processing_status": "queued"},
+        {"processing_status": "uploaded", "updated_at": {"$gte": in_flight_cutoff()}},
+        {"reparse_pending": True}
+    ]
+
+
+def build_query(
+    statuses: Optional[List[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    include_current: bool = False
+) -> Dict:
+    """Mongo filter for CVs that need re-parsing"""
+    query = {}
+    if statuses:
+        query["processing_status"] = {"$in": statuses}
+    if since or until:
+        query["upload_time"] = {}
+        if since:
+            query["upload_time"]["$gte"] = since
+        if until:
+            query["upload_time"]["$lt"] = until
+    # Never pick up CVs already waiting for or going through a parse
+    query["$nor"] = in_flight_filters()
+    if not include_current:
+        query["$or"] = [
+            {"parser_version": {"$exists": False}},
+            {"parser_version": {"$lt": PARSER_VERSION}}
+        ]
+    return query
+
+
+def _init_worker():
+    # Spawned workers start from a clean interpreter: importing the task module here opens
+    # this process's own MongoClient (pymongo clients are not fork-safe) and loads the
+    # parser models once per worker rather than once per CV
+    import app.celery_worker  # noqa: F401
+
+
+def _reparse(cv_id: str, file_path: str, original_name: str):
+    from app.celery_worker import parse_cv_task
+    parse_cv_task(cv_id, file_path, original_name)
+
+
+def run_reprocess(
+    job: str,
+    statuses: Optional[List[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    include_current: bool = False,
+    mode: str = "process",
+    workers: int = 4,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    rate: float = DEFAULT_RATE,
+    restart: bool = False
+) -> Dict:
+    """Re-parse matching CVs chunk by chunk, checkpointing after each chunk.
+
+    mode: "inline" (this process), "process" (local process pool) or
+    "celery" (flag the CVs `reparse_pending` for the bulk queue dispatcher).
+    """
+    if mode not in ("inline", "process", "celery"):
+        raise ValueError(f"Unknown mode: {mode}")
+
+    if restart:
+        db.jobs.delete_one({"_id": job})
+    checkpoint = db.jobs.find_one({"_id": job}) or {}
+    last_id = checkpoint.get("last_id")
+    stats = {
+        "processed": checkpoint.get("processed", 0),
+        "skipped": checkpoint.get("skipped", 0)
+    }
+
+    base_query = build_query(statuses, since, until, include_current)
+    db.jobs.update_one(
+        {"_id": job},
+        {"$set": {
+            "status": "running",
+            "parser_version": PARSER_VERSION,
+            "filters": {
+                "statuses": statuses,
+                "since": since,
+                "until": until,
+                "include_current": include_current
+            },
+            "started_at": checkpoint.get("started_at") or datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }},
+        upsert=True
+    )
+
+    limiter = RateLimiter(rate)
+    pool = None
+    if mode == "process":
+        # spawn, not fork: the parent already holds a connected MongoClient
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+    try:
+        while True:
+            query = dict(base_query)
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            chunk = list(
+                db.cvs.find(query, {"stored_filename": 1, "original_filename": 1, "user_email": 1})
+                .sort("_id", 1)
+                .limit(chunk_size)
+            )
+            if not chunk:
+                break
+
+            futures = []
+            parked = []
+            for cv in chunk:
+                file_path = os.path.join(UPLOAD_DIR, cv.get("stored_filename") or "")
+                if not cv.get("stored_filename") or not os.path.exists(file_path):
+                    stats["skipped"] += 1
+                    continue
+
+                limiter.acquire()
+                args = (str(cv["_id"]), file_path, cv.get("original_filename") or cv["stored_filename"])
+                if mode == "celery":
+                    parked.append(cv["_id"])
+                elif mode == "process":
+                    futures.append(pool.submit(_reparse, *args))
+                else:
+                    _reparse(*args)
+                stats["processed"] += 1
+
+            # Only advance the checkpoint once the whole chunk is done
+            for future in futures:
+                future.result()
+            if parked:
+                # dispatch_bulk_work feeds flagged CVs to the bulk queue fairly and within
+                # BULK_QUEUE_TARGET; their status is left alone so they stay searchable meanwhile
+                db.cvs.update_many(
+                    {"_id": {"$in": parked}, "$nor": in_flight_filters()},
+                    {"$set": {"reparse_pending": True}}
+                )
+                dispatch_bulk_work()
+
+            last_id = chunk[-1]["_id"]
+            db.jobs.update_one(
+                {"_id": job},
+                {"$set": {"last_id": last_id, **stats, "updated_at": datetime.utcnow()}}
+            )
+            print(f"🔁 {job}: processed {stats['processed']}, skipped {stats['skipped']} (last _id {last_id})")
+    except Exception as e:
+        db.jobs.update_one({"_id": job}, {"$set": {"status": "failed", "error": str(e), "updated_at": datetime.utcnow()}})
+        raise
+    finally:
+        if pool:
+            pool.shutdown()
+
+    db.jobs.update_one(
+        {"_id": job},
+        {"$set": {"status": "completed", **stats, "finished_at": datetime.utcnow(), "updated_at": datetime.utcnow()}}
+    )
+    return stats
+
+
+def _parse_date(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Re-parse stored CVs with the current parser")
+    arg_parser.add_argument("--job", default=f"reparse-v{PARSER_VERSION}", help="Checkpoint name; reuse it to resume")
+    arg_parser.add_argument("--status", nargs="+", default=None, help="Only CVs in these processing statuses")
+    arg_parser.add_argument("--since", type=_parse_date, default=None, help="Uploaded on/after (ISO date)")
+    arg_parser.add_argument("--until", type=_parse_date, default=None, help="Uploaded before (ISO date)")
+    arg_parser.add_argument("--all-versions", action="store_true", help="Also re-parse CVs already on the current parser_version")
+    arg_parser.add_argument("--mode", choices=["inline", "process", "celery"], default="process")
+    arg_parser.add_argument("--workers", type=int, default=4)
+    arg_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    arg_parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Max CVs per second (0 = unlimited)")
+    arg_parser.add_argument("--restart", action="store_true", help="Ignore any saved checkpoint")
+    args = arg_parser.parse_args(argv)
+
+    stats = run_reprocess(
+        job=args.job,
+        statuses=args.status,
+        since=args.since,
+        until=args.until,
+        include_current=args.all_versions,
+        mode=args.mode,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        rate=args.rate,
+        restart=args.restart
+    )
+    print(f"✅ {args.job} finished: {stats}")
+
+
+if __name__ == "__main__":
+    main()
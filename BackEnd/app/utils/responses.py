@@ -0,0 +1,31 @@
+from decimal import Decimal
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+
+def _default(value):
+    # orjson handles datetime/date/UUID/dataclasses natively; these are the Mongo leftovers
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson, with ObjectId support.
+
+    Return it with raw Mongo-derived dicts instead of running them through
+    jsonable_encoder first; datetimes are emitted as ISO 8601 like before.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
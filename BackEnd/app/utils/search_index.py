@@ -0,0 +1,488 @@
+import calendar
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from app.utils.index_snapshot import (
+    IndexSnapshot, DeltaLog, read_log, write_snapshot, snapshot_order, snapshot_path, delta_log_path, stale_files,
+    claim_slot
+)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+# Largest edit distance the deletion index is built for (term~1 / term~2)
+MAX_EDIT_DISTANCE = 2
+# Very short terms expand to half the vocabulary, so they are always matched exactly
+MIN_FUZZY_TERM_LENGTH = 4
+# Long tokens are almost always URLs/ids and blow up the deletion index
+MAX_INDEXED_TERM_LENGTH = 32
+# Only alphabetic terms in this length range get deletion-index entries
+MAX_FUZZY_TERM_LENGTH = 24
+# Deletes are generated from this prefix only (SymSpell's prefix_length): at distance 2
+# a term yields at most 1 + 7 + 21 = 29 keys instead of up to 301, and candidates are
+# verified against the full term anyway.
+# Memory budget: in-memory deletes cost ~3.5 KB per distinct fuzzy-eligible term per
+# process (the 26k-term skills + titles vocabulary: ~95 MB, against ~235 MB uncapped).
+# With INDEX_SNAPSHOT_DIR, compacted terms live in the process's mmapped snapshot, paged
+# in on demand and reclaimable by the OS; only terms added since the last compaction are
+# held on the heap.
+DELETE_PREFIX_LENGTH = 7
+
+# Fold the delta log into a fresh snapshot after this many logged mutations
+COMPACT_AFTER_ENTRIES = int(os.getenv("INDEX_COMPACT_AFTER", "5000"))
+# Idle checkpoints (resume token / watermark only) are logged at most this often
+CHECKPOINT_LOG_SECONDS = 30
+# Searches reconcile the index with Mongo at most this often when nothing else syncs it
+ON_DEMAND_SYNC_SECONDS = float(os.getenv("INDEX_ON_DEMAND_SYNC_SECONDS", "5"))
+# Overlap applied to the polling watermark to tolerate clock skew between writers
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+def is_fuzzy_eligible(term: str) -> bool:
+    return term.isalpha() and MIN_FUZZY_TERM_LENGTH <= len(term) <= MAX_FUZZY_TERM_LENGTH
+
+
+def document_meta(cv: dict) -> Dict:
+    """Per-document columns kept alongside the postings: batch year, upload epoch, tags, owner"""
+    try:
+        batch = int(cv.get("graduation_batch")) if cv.get("graduation_batch") else None
+    except (TypeError, ValueError):
+        batch = None
+    if batch is not None and (batch < 1950 or batch > 2030):
+        batch = None
+
+    upload_time = cv.get("upload_time")
+    upload_epoch = calendar.timegm(upload_time.utctimetuple()) if isinstance(upload_time, datetime) else None
+
+    tags = sorted({t.lower() for t in cv.get("tags") or [] if isinstance(t, str)})
+    return {"batch": batch, "upload_time": upload_epoch, "tags": tags, "owner": cv.get("user_email")}
+
+
+def generate_deletes(term: str, max_distance: int) -> Set[str]:
+    """All strings reachable from term by removing up to max_distance characters"""
+    results = {term}
+    frontier = {term}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for word in frontier:
+            if len(word) <= 1:
+                continue
+            for i in range(len(word)):
+                next_frontier.add(word[:i] + word[i + 1:])
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+def delete_keys(term: str, max_distance: int) -> Set[str]:
+    """Deletion-index keys for term: the deletes of its DELETE_PREFIX_LENGTH prefix"""
+    return generate_deletes(term[:DELETE_PREFIX_LENGTH], max_distance)
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Damerau (optimal string alignment) distance, bailing out once it exceeds max_distance"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (
+                previous_previous is not None and i > 1 and j > 1
+                and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]
+            ):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class SearchIndex:
+    """Inverted index over CV raw_text with a SymSpell-style deletion index for
+    typo-tolerant term expansion.
+
+    Documents live in two layers: an optional memory-mapped snapshot (`base`) and
+    in-memory dicts for everything changed since (`postings`/`doc_terms`/`deletes`).
+    Base documents that were deleted or re-indexed are masked via `removed`. When
+    opened on a directory, every mutation is appended to a delta log so a restart
+    is snapshot open + log replay instead of a rebuild from Mongo.
+    """
+
+    def __init__(self, max_distance: int = MAX_EDIT_DISTANCE):
+        self.max_distance = max_distance
+        self.postings: Dict[str, Set[str]] = defaultdict(set)
+        self.doc_terms: Dict[str, Set[str]] = {}
+        self.doc_meta: Dict[str, Dict] = {}
+        self.deletes: Dict[str, Set[str]] = defaultdict(set)
+        self.base: Optional[IndexSnapshot] = None
+        self.removed: Set[str] = set()
+        self._lock = threading.RLock()
+        # Persistence (see open()); mutations are only logged when a directory is attached
+        self.directory: Optional[str] = None
+        self.delta_log: Optional[DeltaLog] = None
+        self._slot_lock = None
+        self._replaying = False
+        self._dirty = False
+        self._last_checkpoint_log = 0.0
+        self._sync_lock = threading.Lock()
+        self._last_sync = 0.0
+        # Sync state (see index_sync.py): set once fully loaded, plus where to resume from
+        self.sync_thread: Optional[threading.Thread] = None
+        self.ready = False
+        self.resume_token = None
+        self.watermark = None
+
+    def _base_number(self, cv_id: str) -> int:
+        if self.base is None or cv_id in self.removed:
+            return -1
+        return self.base.doc_number(cv_id)
+
+    def __contains__(self, cv_id: str) -> bool:
+        with self._lock:
+            return cv_id in self.doc_terms or self._base_number(cv_id) >= 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            base_count = self.base.doc_count - len(self.removed) if self.base else 0
+            return len(self.doc_terms) + base_count
+
+    def doc_ids(self) -> Set[str]:
+        with self._lock:
+            ids = set(self.doc_terms)
+            if self.base is not None:
+                ids.update(cv_id for cv_id in self.base.doc_ids() if cv_id not in self.removed)
+            return ids
+
+    def get_meta(self, cv_id: str) -> Optional[Dict]:
+        with self._lock:
+            if cv_id in self.doc_meta:
+                return self.doc_meta[cv_id]
+            number = self._base_number(cv_id)
+            return self.base.meta(number) if number >= 0 else None
+
+    def _log(self, entry: Dict):
+        if self.delta_log is not None and not self._replaying:
+            self.delta_log.append(entry)
+
+    def clear(self):
+        with self._lock:
+            self._clear_memory()
+            if self.base is not None:
+                self.base.close()
+                self.base = None
+            self.ready = False
+            self.resume_token = None
+            self.watermark = None
+            self._log({"op": "clear"})
+
+    def _clear_memory(self):
+        self.postings.clear()
+        self.doc_terms.clear()
+        self.doc_meta.clear()
+        self.deletes.clear()
+        self.removed.clear()
+
+    def _index_term(self, term: str):
+        if not is_fuzzy_eligible(term):
+            return
+        for deleted in delete_keys(term, self.max_distance):
+            self.deletes[deleted].add(term)
+
+    def _unindex_term(self, term: str):
+        if not is_fuzzy_eligible(term):
+            return
+        for deleted in delete_keys(term, self.max_distance):
+            terms = self.deletes.get(deleted)
+            if terms is None:
+                continue
+            terms.discard(term)
+            if not terms:
+                del self.deletes[deleted]
+
+    def add_document(self, cv_id: str, text: str, meta: Optional[Dict] = None):
+        terms = {t for t in tokenize(text) if len(t) <= MAX_INDEXED_TERM_LENGTH}
+        self._add_terms(cv_id, terms, meta or {})
+
+    def _add_terms(self, cv_id: str, terms: Set[str], meta: Dict):
+        with self._lock:
+            self._remove_from_memory(cv_id)
+            if self._base_number(cv_id) >= 0:
+                self.removed.add(cv_id)
+            for term in terms:
+                if term not in self.postings:
+                    self._index_term(term)
+                self.postings[term].add(cv_id)
+            self.doc_terms[cv_id] = terms
+            self.doc_meta[cv_id] = meta
+            self._dirty = True
+            self._log({"op": "add", "id": cv_id, "terms": sorted(terms), "meta": meta})
+
+    def _remove_from_memory(self, cv_id: str):
+        terms = self.doc_terms.pop(cv_id, None)
+        self.doc_meta.pop(cv_id, None)
+        if not terms:
+            return
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs is None:
+                continue
+            docs.discard(cv_id)
+            if not docs:
+                del self.postings[term]
+                self._unindex_term(term)
+
+    def remove_document(self, cv_id: str):
+        with self._lock:
+            in_memory = cv_id in self.doc_terms
+            self._remove_from_memory(cv_id)
+            in_base = self._base_number(cv_id) >= 0
+            if in_base:
+                self.removed.add(cv_id)
+            if in_memory or in_base:
+                self._dirty = True
+                self._log({"op": "remove", "id": cv_id})
+
+    def checkpoint(self, resume_token=None, watermark: Optional[datetime] = None):
+        """Record how far the index has been synced; logged when it matters for a restart"""
+        with self._lock:
+            if resume_token is not None:
+                self.resume_token = resume_token
+            if watermark is not None:
+                self.watermark = watermark
+            now = time.monotonic()
+            if self._dirty or now - self._last_checkpoint_log >= CHECKPOINT_LOG_SECONDS:
+                self._log({"op": "checkpoint", "resume_token": self.resume_token, "watermark": self.watermark})
+                self._last_checkpoint_log = now
+                self._dirty = False
+
+    def expand(self, term: str, max_distance: int = 1) -> List[str]:
+        """Vocabulary terms within max_distance edits of term (including term itself)"""
+        term = term.lower()
+        max_distance = max(0, min(max_distance, self.max_distance))
+        if len(term) < MIN_FUZZY_TERM_LENGTH:
+            max_distance = 0
+
+        with self._lock:
+            candidates = set()
+            if max_distance == 0 or not is_fuzzy_eligible(term):
+                # Exact lookup; the deletion index only covers fuzzy-eligible terms
+                if term in self.postings or (self.base is not None and self.base.term_number(term) >= 0):
+                    candidates.add(term)
+            for deleted in delete_keys(term, max_distance):
+                candidates |= self.deletes.get(deleted, set())
+                if self.base is not None:
+                    candidates.update(self.base.deletes(deleted))
+
+        return sorted(
+            candidate for candidate in candidates
+            if edit_distance(term, candidate, max_distance) <= max_distance
+        )
+
+    def lookup(self, terms: Iterable[str], owners: Optional[Iterable[str]] = None) -> Set[str]:
+        """CV ids containing any of the given terms, optionally only those owned by owners.
+
+        Snapshot documents are numbered by owner, so an owner's hits are found by
+        bisecting each posting list rather than walking it.
+        """
+        owners = set(owners) if owners is not None else None
+        matches = set()
+        with self._lock:
+            ranges = [self.base.owner_range(owner) for owner in owners] if self.base and owners is not None else None
+            for term in terms:
+                delta_ids = self.postings.get(term, set())
+                if owners is not None:
+                    delta_ids = {cv_id for cv_id in delta_ids if self.doc_meta[cv_id].get("owner") in owners}
+                matches |= delta_ids
+                if self.base is None:
+                    continue
+                numbers = self.base.postings(term)
+                if ranges is not None:
+                    posting_array = np.frombuffer(numbers, dtype=np.uint32)
+                    numbers = []
+                    for lo, hi in ranges:
+                        start, end = np.searchsorted(posting_array, [lo, hi])
+                        numbers.extend(posting_array[start:end].tolist())
+                base_ids = {self.base.doc_id(number) for number in numbers}
+                matches |= base_ids - self.removed
+        return matches
+
+    def needs_on_demand_sync(self) -> bool:
+        """True when nothing else keeps the index current (no live IndexSynchronizer thread)"""
+        if self.ready:
+            return False
+        return self.sync_thread is None or not self.sync_thread.is_alive()
+
+    def sync(self, collection):
+        """Catch the index up with the collection when no IndexSynchronizer is running.
+
+        The first call loads every completed CV; later ones only read CVs whose
+        updated_at passed the watermark plus new deletion tombstones, and at most
+        once every ON_DEMAND_SYNC_SECONDS.
+        """
+        with self._sync_lock:
+            now = time.monotonic()
+            if self.watermark is not None and now - self._last_sync < ON_DEMAND_SYNC_SECONDS:
+                return
+            self._last_sync = now
+            started = datetime.utcnow()
+            since = self.watermark
+            projection = {"raw_text": 1, "processing_status": 1, "graduation_batch": 1, "upload_time": 1, "tags": 1, "user_email": 1}
+
+            if since is None:
+                for cv in collection.find({"processing_status": "completed"}, projection).batch_size(500):
+                    self.add_document(str(cv["_id"]), cv.get("raw_text") or "", document_meta(cv))
+            else:
+                # Re-parsed CVs get a new updated_at, so they are re-indexed here too
+                for cv in collection.find({"updated_at": {"$gte": since}}, projection):
+                    if cv.get("processing_status") == "completed":
+                        self.add_document(str(cv["_id"]), cv.get("raw_text") or "", document_meta(cv))
+                    else:
+                        self.remove_document(str(cv["_id"]))
+                for tombstone in collection.database.cv_deletions.find({"deleted_at": {"$gte": since}}):
+                    self.remove_document(tombstone["cv_id"])
+
+            self.checkpoint(watermark=started - WATERMARK_OVERLAP)
+
+    # Persistence
+
+    def _replay(self, path: str):
+        self._replaying = True
+        try:
+            for entry in read_log(path):
+                op = entry.get("op")
+                if op == "add":
+                    self._add_terms(entry["id"], set(entry["terms"]), entry.get("meta") or {})
+                elif op == "remove":
+                    self.remove_document(entry["id"])
+                elif op == "clear":
+                    self.clear()
+                elif op == "checkpoint":
+                    self.resume_token = entry.get("resume_token")
+                    watermark = entry.get("watermark")
+                    self.watermark = datetime.fromisoformat(watermark) if watermark else None
+        finally:
+            self._replaying = False
+
+    def open(self, directory: str):
+        """Load the snapshot and delta log from this process's slot in directory and log further mutations there"""
+        with self._lock:
+            # The slot stays locked for the life of the process (see index_snapshot)
+            directory, self._slot_lock = claim_slot(directory)
+            self.directory = directory
+            # After a format upgrade the old files are unreadable; the index is rebuilt instead
+            for stale in stale_files(directory):
+                print("⚠️ Removing search index file from another format version:", stale)
+                os.remove(stale)
+            path = snapshot_path(directory)
+            if os.path.exists(path):
+                try:
+                    self.base = IndexSnapshot(path)
+                    self.resume_token = self.base.header.get("resume_token")
+                    watermark = self.base.header.get("watermark")
+                    self.watermark = datetime.fromisoformat(watermark) if watermark else None
+                except (OSError, ValueError) as e:
+                    print("⚠️ Ignoring unreadable search index snapshot:", e)
+                    self.base = None
+
+            log_path = delta_log_path(directory)
+            if self.base is not None:
+                # A compaction interrupted by a crash leaves its rotated log behind; it applies first
+                self._replay(f"{log_path}.compacting")
+                self._replay(log_path)
+            else:
+                # The log only holds changes on top of a snapshot; on its own its checkpoint
+                # would mark a partial index ready, so drop it and let the sync rebuild
+                for stale in (f"{log_path}.compacting", log_path):
+                    if os.path.exists(stale):
+                        os.remove(stale)
+                self.resume_token = None
+                self.watermark = None
+            self.delta_log = DeltaLog(log_path)
+            self.ready = self.base is not None and (self.resume_token is not None or self.watermark is not None)
+
+    def maybe_compact(self):
+        if self.delta_log is not None and self.delta_log.entries >= COMPACT_AFTER_ENTRIES:
+            self.compact()
+
+    def compact(self):
+        """Fold the base snapshot and in-memory changes into a new snapshot"""
+        if self.delta_log is None:
+            return
+
+        with self._lock:
+            base = self.base
+            removed = set(self.removed)
+            delta_postings = {term: set(ids) for term, ids in self.postings.items()}
+            delta_meta = dict(self.doc_meta)
+            header = {
+                "resume_token": self.resume_token,
+                "watermark": self.watermark.isoformat() if self.watermark else None,
+                "max_distance": self.max_distance
+            }
+            rotated = self.delta_log.rotate()
+
+        # Build and write outside the lock; mutations keep landing in the new log
+        metas_by_id = dict(delta_meta)
+        if base is not None:
+            for number in range(base.doc_count):
+                cv_id = base.doc_id(number)
+                if cv_id not in removed and cv_id not in metas_by_id:
+                    metas_by_id[cv_id] = base.meta(number)
+        doc_ids = sorted(metas_by_id, key=lambda cv_id: snapshot_order(cv_id, metas_by_id[cv_id]))
+        new_numbers = {cv_id: i for i, cv_id in enumerate(doc_ids)}
+
+        postings = {}
+        if base is not None:
+            old_to_new = np.full(base.doc_count, -1, dtype=np.int64)
+            for number in range(base.doc_count):
+                old_to_new[number] = new_numbers.get(base.doc_id(number), -1)
+            for number in range(base.term_count):
+                mapped = old_to_new[np.frombuffer(base.postings_at(number), dtype=np.uint32)]
+                # Both layouts order by (owner, id), so the remap normally stays sorted
+                mapped = np.sort(mapped[mapped >= 0])
+                if len(mapped):
+                    postings[base.term(number)] = mapped
+        for term, ids in delta_postings.items():
+            numbers = np.array(sorted(new_numbers[cv_id] for cv_id in ids), dtype=np.int64)
+            postings[term] = np.union1d(postings[term], numbers) if term in postings else numbers
+
+        deletes = defaultdict(list)
+        for term_number, term in enumerate(sorted(postings)):
+            if is_fuzzy_eligible(term):
+                for deleted in delete_keys(term, self.max_distance):
+                    deletes[deleted].append(term_number)
+
+        metas = [metas_by_id[cv_id] for cv_id in doc_ids]
+
+        path = snapshot_path(self.directory)
+        write_snapshot(path, doc_ids, metas, postings, deletes, header)
+        del postings, deletes
+
+        with self._lock:
+            old_base = self.base
+            self._clear_memory()
+            self.base = IndexSnapshot(path)
+            # Re-apply what happened while the snapshot was being written
+            self._replay(delta_log_path(self.directory))
+            if old_base is not None:
+                old_base.close()
+        os.remove(rotated)
+        print(f"✅ Search index snapshot written: {len(doc_ids)} CVs")
+
+
+# Shared per-process index used by the search endpoints
+search_index = SearchIndex()
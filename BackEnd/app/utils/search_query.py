@@ -0,0 +1,286 @@
+"""Query planning and matching shared by /search-cvs, exports and the percolator.
+
+prepare_search turns a boolean query plus filters into a plan; iter_search_matches
+runs a plan over any iterable of CV documents (a Mongo cursor or a single CV).
+"""
+from typing import List, Optional
+from datetime import datetime, timedelta
+import re
+
+from app.db.mongodb import db
+from app.utils.scorer import compute_match_score
+from app.utils.search_index import search_index
+
+def parse_boolean_query(query: str):
+    """Parse boolean query and return keywords and mode"""
+    # Handle quoted phrases
+    quoted_phrases = re.findall(r'"([^"]*)"', query)
+    
+    # Remove quoted phrases from query temporarily
+    temp_query = query
+    for phrase in quoted_phrases:
+        temp_query = temp_query.replace(f'"{phrase}"', '')
+    
+    if ' or ' in temp_query.lower():
+        keywords = [kw.strip().lower() for kw in temp_query.split(' or ') if kw.strip()]
+        mode = 'OR'
+    elif ' and ' in temp_query.lower():
+        keywords = [kw.strip().lower() for kw in temp_query.split(' and ') if kw.strip()]
+        mode = 'AND'
+    else:
+        keywords = [kw.strip().lower() for kw in temp_query.split() if kw.strip()]
+        mode = 'AND'
+    
+    # Add quoted phrases back as single keywords
+    keywords.extend([phrase.lower() for phrase in quoted_phrases])
+    
+    return keywords, mode
+
+FUZZY_KEYWORD_PATTERN = re.compile(r'^(\S+)~(\d)?$')
+
+def parse_fuzzy_keyword(keyword: str):
+    """Return (term, max_distance) for a fuzzy keyword like 'accenture~1', else None"""
+    match = FUZZY_KEYWORD_PATTERN.match(keyword)
+    if not match:
+        return None
+    return match.group(1), int(match.group(2) or 1)
+
+def strip_fuzzy_operators(query: str) -> str:
+    """Drop the ~k suffixes so scoring sees the plain terms"""
+    return re.sub(r'(\S)~\d?(?=\s|$)', r'\1', query)
+
+def search_in_text(text: str, keywords: list, mode: str, fuzzy_hits: Optional[dict] = None, cv_id: Optional[str] = None) -> bool:
+    """Search for keywords in text with better matching.
+
+    Keywords present in fuzzy_hits are matched through the index postings
+    (the set of CV ids containing any expansion) instead of substring search.
+    """
+    if not keywords:
+        return False
+    
+    text_lower = text.lower()
+    fuzzy_hits = fuzzy_hits or {}
+
+    def matches(keyword):
+        if keyword in fuzzy_hits:
+            return cv_id in fuzzy_hits[keyword]
+        return keyword in text_lower
+    
+    if mode == "AND":
+        # All keywords must be present
+        for keyword in keywords:
+            if keyword and not matches(keyword):
+                return False
+        return True
+    else:  # OR mode
+        # At least one keyword must be present
+        for keyword in keywords:
+            if keyword and matches(keyword):
+                return True
+        return False
+
+UPLOAD_RANGES = {
+    "1m": (30, "after"),
+    "3m": (90, "after"),
+    "6m": (180, "after"),
+    "1y": (365, "after"),
+    "2y": (730, "after"),
+    "2y+": (730, "before"),
+}
+
+def prepare_search(
+    query: str,
+    tags: Optional[str] = None,
+    batch_min: Optional[int] = None,
+    batch_max: Optional[int] = None,
+    last_education: Optional[str] = None,
+    upload_range: Optional[str] = None,
+    owners: Optional[List[str]] = None,
+    exp_min: Optional[float] = None,
+    exp_max: Optional[float] = None,
+    expand_fuzzy: bool = True
+) -> dict:
+    """Parse a query and its filters into the plan consumed by iter_search_matches.
+
+    owners limits fuzzy expansion hits to those owners' CVs (None = all CVs).
+    With expand_fuzzy=False the caller fills plan["fuzzy_hits"] itself.
+    """
+    # Parse the search query
+    keywords, mode = parse_boolean_query(query)
+
+    # Expand fuzzy terms (e.g. 'accenture~1') to nearby vocabulary terms via the index
+    fuzzy_expansions = {}
+    fuzzy_hits = {}
+    fuzzy_keywords = {}
+    for keyword in keywords:
+        parsed = parse_fuzzy_keyword(keyword)
+        if parsed:
+            fuzzy_keywords[keyword] = parsed
+    if fuzzy_keywords and expand_fuzzy:
+        # Without a running IndexSynchronizer, reconcile the index on demand; while one is
+        # still building, search what is loaded so far instead of loading everything twice
+        if search_index.needs_on_demand_sync():
+            search_index.sync(db.cvs)
+        for keyword, (term, max_distance) in fuzzy_keywords.items():
+            hits = set()
+            expansions = []
+            # Only report expansions that occur in the caller's pool; the vocabulary is shared
+            for expansion in search_index.expand(term, max_distance):
+                expansion_hits = search_index.lookup([expansion], owners)
+                if expansion_hits:
+                    expansions.append(expansion)
+                    hits |= expansion_hits
+            fuzzy_expansions[keyword] = expansions
+            fuzzy_hits[keyword] = hits
+    
+    # Parse tags filter - only apply if explicitly provided and not empty
+    required_tags = []
+    if tags and tags.strip():
+        required_tags = [tag.strip().lower() for tag in tags.split(',') if tag.strip()]
+
+    # Parse upload range filter - only apply if explicitly provided and not empty
+    upload_threshold = None
+    upload_comparison = None
+    if upload_range and upload_range.strip() and upload_range in UPLOAD_RANGES:
+        days, upload_comparison = UPLOAD_RANGES[upload_range]
+        upload_threshold = datetime.utcnow() - timedelta(days=days)
+
+    return {
+        "query": query,
+        "score_query": strip_fuzzy_operators(query),
+        "keywords": keywords,
+        "mode": mode,
+        "fuzzy_expansions": fuzzy_expansions,
+        "fuzzy_hits": fuzzy_hits,
+        "tags": tags if tags and tags.strip() else None,
+        "required_tags": required_tags,
+        "batch_min": batch_min,
+        "batch_max": batch_max,
+        "last_education": last_education if last_education and last_education.strip() else None,
+        "upload_range": upload_range if upload_range and upload_range.strip() else None,
+        "upload_threshold": upload_threshold,
+        "upload_comparison": upload_comparison,
+        "owners": owners,
+        "exp_min": exp_min,
+        "exp_max": exp_max
+    }
+
+def mongo_filter(plan: dict) -> dict:
+    """Filters pushed down to Mongo: the plan's owners and experience range.
+
+    Both are served by the (user_email, total_experience_months) index, so an
+    experience-filtered search never loads CVs outside the range.
+    """
+    query = {}
+    if plan["owners"] is not None:
+        query["user_email"] = {"$in": plan["owners"]}
+    if plan["exp_min"] is not None or plan["exp_max"] is not None:
+        months = {}
+        if plan["exp_min"] is not None:
+            months["$gte"] = round(plan["exp_min"] * 12)
+        if plan["exp_max"] is not None:
+            months["$lte"] = round(plan["exp_max"] * 12)
+        query["total_experience_months"] = months
+    return query
+
+def new_filter_stats() -> dict:
+    return {
+        "total_cvs": 0,
+        "completed_processing": 0,
+        "passed_tag_filter": 0,
+        "passed_batch_filter": 0,
+        "passed_education_filter": 0,
+        "passed_upload_filter": 0,
+        "passed_keyword_filter": 0,
+        "final_results": 0
+    }
+
+def iter_search_matches(plan: dict, cvs, filter_stats: Optional[dict] = None):
+    """Yield (cv, match_score) for every CV in the iterable that satisfies the plan"""
+    if filter_stats is None:
+        filter_stats = new_filter_stats()
+
+    required_tags = plan["required_tags"]
+    batch_min = plan["batch_min"]
+    batch_max = plan["batch_max"]
+    last_education = plan["last_education"]
+    upload_threshold = plan["upload_threshold"]
+    upload_comparison = plan["upload_comparison"]
+
+    for cv in cvs:
+        filter_stats["total_cvs"] += 1
+        
+        # Check processing status
+        if cv.get("processing_status") != "completed":
+            continue
+        filter_stats["completed_processing"] += 1
+        
+        # Get CV text and metadata
+        raw_text = cv.get("raw_text") or ""
+        cv_tags = [t.lower() for t in cv.get("tags", [])]
+        
+        # Tag filter - only apply if tags are explicitly provided
+        if required_tags:
+            if not all(tag in cv_tags for tag in required_tags):
+                continue
+        filter_stats["passed_tag_filter"] += 1
+
+        # Graduation batch filter - only apply if explicitly provided
+        batch = cv.get("graduation_batch")
+        try:
+            batch = int(batch) if batch else None
+        except (TypeError, ValueError):
+            batch = None
+
+        # Apply reasonable bounds to batch years (1950-2030)
+        if batch is not None and (batch < 1950 or batch > 2030):
+            batch = None
+
+        # Only apply batch filters if they are explicitly set (not None)
+        if batch_min is not None and (batch is None or batch < batch_min):
+            continue
+        if batch_max is not None and (batch is None or batch > batch_max):
+            continue
+        filter_stats["passed_batch_filter"] += 1
+
+        # Last education filter - only apply if explicitly provided and not empty
+        if last_education:
+            le = (cv.get("last_education") or "").lower()
+            if last_education.lower() not in le:
+                continue
+        filter_stats["passed_education_filter"] += 1
+
+        # Upload time filter - only apply if explicitly provided and not empty
+        upload_time = cv.get("upload_time")
+        if isinstance(upload_time, str):
+            try:
+                upload_time = datetime.fromisoformat(upload_time.replace('Z', '+00:00'))
+            except ValueError:
+                upload_time = None
+
+        # Only apply upload range filter if it's explicitly set and valid
+        if upload_threshold:
+            if upload_comparison == "after":
+                if not upload_time or upload_time < upload_threshold:
+                    continue
+            elif upload_comparison == "before":
+                if upload_time and upload_time > upload_threshold:
+                    continue
+        filter_stats["passed_upload_filter"] += 1
+
+        # Keyword search in raw text
+        if search_in_text(raw_text, plan["keywords"], plan["mode"], fuzzy_hits=plan["fuzzy_hits"], cv_id=str(cv["_id"])):
+            filter_stats["passed_keyword_filter"] += 1
+            
+            # Calculate match score
+            score = compute_match_score(
+                cv_text=raw_text,
+                query=plan["score_query"],
+                skills=cv.get("skills", []),
+                position=cv.get("current_position"),
+                company=cv.get("current_company"),
+                name=cv.get("name"),
+                email=cv.get("email")
+            )
+            filter_stats["final_results"] += 1
+            yield cv, score
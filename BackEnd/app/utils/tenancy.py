@@ -0,0 +1,64 @@
+"""CV ownership scopes: which owners' CVs a user may search, and where their work runs.
+
+Every CV belongs to the user who uploaded it (`cvs.user_email`). Users that share a
+`team` on their user document search one pooled corpus made up of every member's CVs;
+everyone else only sees their own uploads.
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.db.mongodb import db
+
+# Team membership changes rarely; avoid a users lookup on every search
+SCOPE_CACHE_SECONDS = float(os.getenv("SCOPE_CACHE_SECONDS", "60"))
+
+# Large tenants can be pinned to their own Celery queue: "owner@x.com=tenant-x,team:acme=tenant-acme"
+DEDICATED_QUEUES = dict(
+    item.strip().split("=", 1)
+    for item in os.getenv("DEDICATED_TENANT_QUEUES", "").split(",")
+    if "=" in item
+)
+
+_scope_cache: Dict[str, Tuple[float, List[str]]] = {}
+_scope_lock = threading.Lock()
+
+
+def user_team(user_email: str) -> Optional[str]:
+    user = db.users.find_one({"email": user_email}, {"team": 1})
+    return user.get("team") if user else None
+
+
+def search_scope(user_email: str) -> List[str]:
+    """Owner emails whose CVs user_email may search (sorted, always including themselves)"""
+    now = time.monotonic()
+    with _scope_lock:
+        cached = _scope_cache.get(user_email)
+        if cached and cached[0] > now:
+            return cached[1]
+
+    owners = {user_email}
+    team = user_team(user_email)
+    if team:
+        owners.update(member["email"] for member in db.users.find({"team": team}, {"email": 1}))
+    owners = sorted(owners)
+
+    with _scope_lock:
+        _scope_cache[user_email] = (now + SCOPE_CACHE_SECONDS, owners)
+    return owners
+
+
+def invalidate_scopes():
+    with _scope_lock:
+        _scope_cache.clear()
+
+
+def tenant_queue(user_email: Optional[str]) -> Optional[str]:
+    """Dedicated Celery queue for this owner (or their team), if one is configured"""
+    if not user_email or not DEDICATED_QUEUES:
+        return None
+    if user_email in DEDICATED_QUEUES:
+        return DEDICATED_QUEUES[user_email]
+    team = user_team(user_email)
+    return DEDICATED_QUEUES.get(f"team:{team}") if team else None
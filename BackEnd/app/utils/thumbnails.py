@@ -0,0 +1,46 @@
+import os
+from typing import Optional
+
+import fitz  # pymupdf
+
+THUMBNAIL_WIDTH = 320
+THUMBNAIL_FORMATS = ("webp", "png")
+
+
+def thumbnail_path(file_path: str, fmt: str = "png") -> str:
+    """Thumbnails sit next to the CV: resume.pdf -> resume.thumb.png"""
+    return f"{os.path.splitext(file_path)[0]}.thumb.{fmt}"
+
+
+def render_thumbnail(file_path: str, width: int = THUMBNAIL_WIDTH) -> Optional[str]:
+    """Render the first page of a PDF as PNG (plus WebP when Pillow is available)"""
+    if not file_path.lower().endswith(".pdf"):
+        return None
+
+    png_path = thumbnail_path(file_path, "png")
+    doc = fitz.open(file_path)
+    try:
+        if doc.page_count == 0:
+            return None
+        page = doc[0]
+        zoom = width / page.rect.width
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        pixmap.save(png_path)
+    finally:
+        doc.close()
+
+    try:
+        from PIL import Image
+        with Image.open(png_path) as image:
+            image.save(thumbnail_path(file_path, "webp"), "WEBP", quality=80)
+    except Exception:
+        pass
+
+    return png_path
+
+
+def remove_thumbnails(file_path: str):
+    for fmt in THUMBNAIL_FORMATS:
+        path = thumbnail_path(file_path, fmt)
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,120 @@
+"""Minimal XLSX writer that yields the file while rows are still being produced.
+
+An .xlsx file is a zip of XML parts. zipfile can write to an unseekable sink
+(sizes go into data descriptors), so the worksheet is deflated row by row and
+the compressed bytes are handed out as soon as they exist. Only what exports
+need is supported: one sheet, inline strings and numbers, no styles.
+"""
+import io
+import math
+import re
+import zipfile
+from typing import Iterable, Iterator, List
+from xml.sax.saxutils import escape, quoteattr
+
+FLUSH_ROWS = 200
+
+# XML 1.0 forbids most control characters; PDF text extraction produces them
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+    ' xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name={name} sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+SHEET_END = '</sheetData></worksheet>'
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable file object that collects what zipfile writes"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def column_letter(index: int) -> str:
+    """0 -> A, 25 -> Z, 26 -> AA"""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _cell(ref: str, value) -> str:
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML_CHARS.sub("", "" if value is None else str(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _row(number: int, letters: List[str], values: List) -> str:
+    cells = "".join(_cell(f"{letter}{number}", value) for letter, value in zip(letters, values))
+    return f'<row r="{number}">{cells}</row>'
+
+
+def stream_xlsx(header: List[str], rows: Iterable[List], sheet_name: str = "Sheet1", flush_rows: int = FLUSH_ROWS) -> Iterator[bytes]:
+    """Yield an .xlsx file with header and rows, flushing every flush_rows rows"""
+    letters = [column_letter(i) for i in range(len(header))]
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", CONTENT_TYPES)
+        archive.writestr("_rels/.rels", ROOT_RELS)
+        archive.writestr("xl/workbook.xml", WORKBOOK.format(name=quoteattr(sheet_name)))
+        archive.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS)
+
+        # Without zip64 the sheet is limited to 2 GiB, far beyond any export
+        with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write((SHEET_START + _row(1, letters, header)).encode("utf-8"))
+            pending = []
+            for number, values in enumerate(rows, start=2):
+                pending.append(_row(number, letters, values))
+                if len(pending) >= flush_rows:
+                    sheet.write("".join(pending).encode("utf-8"))
+                    pending.clear()
+                    # The compressor emits output in blocks; most flushes have nothing new yet
+                    data = sink.drain()
+                    if data:
+                        yield data
+            sheet.write(("".join(pending) + SHEET_END).encode("utf-8"))
+    yield sink.drain()
@@ -0,0 +1,321 @@
+"""Offline benchmark suite for CV ingest and search.
+
+Runs against mongomock (or a local MongoDB via --mongo-uri) with Gemini stubbed
+out, so no network or credentials are needed. Results are written as JSON so two
+runs can be diffed.
+
+Usage (from BackEnd/):
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --sizes 1000 10000 100000 --output bench.json
+    python -m benchmarks.run_benchmarks --skip-ingest --skip-search   # response serialization only
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+BENCH_USER = "bench@example.com"
+
+QUERY_SHAPES = {
+    "single_term": {"query": "python"},
+    "and_terms": {"query": "python and sql"},
+    "or_terms": {"query": "tableau or excel or sap"},
+    "phrase": {"query": '"project management"'},
+    "fuzzy_term": {"query": "accenure~1"},
+    "filtered": {"query": "analytics", "tags": "finance", "batch_min": 2012, "batch_max": 2020},
+    "upload_range": {"query": "marketing", "upload_range": "6m"},
+    "experience": {"query": "python", "exp_min": 3, "exp_max": 8},
+}
+
+
+def install_stubs(mongo_uri=None):
+    """Swap in a local Mongo stand-in and an offline Gemini before the app is imported"""
+    os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+    # Sampled profiling would land on some timed runs and skew the tail percentiles
+    os.environ["PROFILE_SAMPLE_RATE"] = "0"
+
+    if mongo_uri:
+        from pymongo import MongoClient
+        client = MongoClient(mongo_uri)
+    else:
+        import mongomock
+        client = mongomock.MongoClient()
+
+    stub = types.ModuleType("app.db.mongodb")
+    stub.client = client
+    stub.db = client["cvtool_bench"]
+    sys.modules["app.db.mongodb"] = stub
+
+    import app.utils.parser as parser
+    parser.extract_fields_with_gemini = stub_gemini
+    return stub.db
+
+
+def stub_gemini(cv_text: str) -> dict:
+    lines = [line.strip() for line in cv_text.splitlines() if line.strip()]
+    return {
+        "name": lines[0] if lines else None,
+        "current_company": None,
+        "current_designation": None,
+        "last_education": None,
+        "batch": None,
+        "Total_Experience": None,
+        "skills": [],
+    }
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def timed_stage(func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    elapsed = time.perf_counter() - start
+    return {
+        "docs": len(items),
+        "seconds": round(elapsed, 4),
+        "docs_per_sec": round(len(items) / elapsed, 2) if elapsed else None,
+    }
+
+
+def bench_ingest(db, pdf_limit=None):
+    from app.utils.parser import extract_text_from_pdf, extract_skills, extract_education, parse_cv_enhanced
+    from app.utils.thumbnails import render_thumbnail
+    import app.celery_worker as celery_worker
+
+    fixtures = sorted(glob.glob(os.path.join(BACKEND_DIR, "uploaded_cvs", "*.pdf")))[:pdf_limit]
+    # Work on copies so thumbnails and other side files never land in the repo
+    workdir = tempfile.TemporaryDirectory(prefix="talend-bench-")
+    pdfs = []
+    for fixture in fixtures:
+        pdfs.append(shutil.copy(fixture, workdir.name))
+    texts = []
+
+    results = {"extract_text_from_pdf": timed_stage(lambda path: texts.append(extract_text_from_pdf(path)), pdfs)}
+    results["extract_text_from_pdf"]["megabytes"] = round(sum(os.path.getsize(p) for p in pdfs) / 1e6, 2)
+    results["extract_skills"] = timed_stage(extract_skills, texts)
+    results["extract_education"] = timed_stage(extract_education, texts)
+    results["parse_cv_enhanced"] = timed_stage(parse_cv_enhanced, texts)
+
+    db.cvs.delete_many({})
+    jobs = []
+    for path in pdfs:
+        inserted = db.cvs.insert_one({
+            "user_email": BENCH_USER,
+            "original_filename": os.path.basename(path),
+            "stored_filename": os.path.basename(path),
+            "upload_time": datetime.utcnow(),
+            "processing_status": "uploaded",
+            "tags": [],
+        })
+        jobs.append((str(inserted.inserted_id), path, os.path.basename(path)))
+    results["render_thumbnail"] = timed_stage(render_thumbnail, pdfs)
+
+    # Thumbnails are timed above; keep them out of the end-to-end parse number
+    celery_worker.render_thumbnail = lambda file_path: None
+    try:
+        results["parse_cv_task"] = timed_stage(lambda job: celery_worker.parse_cv_task(*job), jobs)
+    finally:
+        celery_worker.render_thumbnail = render_thumbnail
+        workdir.cleanup()
+    results["parse_cv_task"]["completed"] = db.cvs.count_documents({"processing_status": "completed"})
+    return results
+
+
+def load_corpus(db, size, seed):
+    from benchmarks.synthetic_corpus import SyntheticCorpus
+
+    db.cvs.delete_many({})
+    batch = []
+    for doc in SyntheticCorpus(seed=seed).generate(size, user_email=BENCH_USER):
+        batch.append(doc)
+        if len(batch) >= 1000:
+            db.cvs.insert_many(batch)
+            batch = []
+    if batch:
+        db.cvs.insert_many(batch)
+
+    # delete_many leaves no tombstones, so start each corpus from a fresh full load
+    from app.utils.search_index import search_index
+    search_index.clear()
+
+
+def bench_search(db, sizes, repeats, seed):
+    from fastapi.security import HTTPAuthorizationCredentials
+    from app.api.search import search_cvs
+    from app.utils.auth import create_access_token
+
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=create_access_token({"sub": BENCH_USER}, expires_minutes=24 * 60)
+    )
+    defaults = {
+        "tags": None, "batch_min": None, "batch_max": None, "last_education": None, "upload_range": None,
+        "exp_min": None, "exp_max": None, "x_profile": None,
+    }
+
+    results = {}
+    for size in sizes:
+        load_corpus(db, size, seed)
+        per_shape = {}
+        for shape, params in QUERY_SHAPES.items():
+            kwargs = {**defaults, **params, "credentials": credentials}
+
+            latencies = []
+            response = None
+            for _ in range(repeats):
+                start = time.perf_counter()
+                response = search_cvs(**kwargs)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+            # Memory is measured in a separate run: tracemalloc skews latency
+            tracemalloc.start()
+            search_cvs(**kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            payload = json.loads(response.body)
+            per_shape[shape] = {
+                "runs": repeats,
+                "p50_ms": round(percentile(latencies, 50), 3),
+                "p95_ms": round(percentile(latencies, 95), 3),
+                "p99_ms": round(percentile(latencies, 99), 3),
+                "peak_memory_mb": round(peak / 1e6, 3),
+                "results": len(payload.get("results", [])),
+            }
+        results[str(size)] = per_shape
+    return results
+
+
+def bench_serialization(repeats, seed, result_count=1000):
+    """Cost of turning a /search-cvs payload into response bytes, old path vs new, per 1k results"""
+    import gzip
+    from bson import ObjectId
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from app.api.search import search_result
+    from app.utils.search_query import new_filter_stats
+    from app.models.search import SearchResponse
+    from app.utils.compression import brotli
+    from app.utils.responses import ORJSONResponse
+    from benchmarks.synthetic_corpus import SyntheticCorpus
+
+    results = []
+    for doc in SyntheticCorpus(seed=seed).generate(result_count, user_email=BENCH_USER):
+        doc["_id"] = ObjectId()
+        results.append(search_result(doc, 12.5))
+    filter_stats = new_filter_stats()
+    filter_stats["final_results"] = len(results)
+    payload = {
+        "results": results,
+        "search_info": {
+            "query": "python",
+            "keywords": ["python"],
+            "mode": "AND",
+            "fuzzy_expansions": {},
+            "filters_applied": {},
+            "active_filters": {
+                "tags_active": False, "batch_min_active": False, "batch_max_active": False, "education_active": False,
+                "upload_range_active": False, "exp_min_active": False, "exp_max_active": False,
+            },
+        },
+        "filter_stats": filter_stats,
+    }
+
+    body = ORJSONResponse(content=payload).body
+    encoders = {
+        "jsonable_encoder": lambda: JSONResponse(content=jsonable_encoder(payload)).body,
+        "response_model": lambda: SearchResponse.model_validate(payload).model_dump_json(by_alias=True),
+        "orjson": lambda: ORJSONResponse(content=payload).body,
+        "gzip": lambda: gzip.compress(body, compresslevel=6),
+    }
+    if brotli is not None:
+        encoders["brotli"] = lambda: brotli.compress(body, mode=brotli.MODE_TEXT, quality=4)
+
+    scale = 1000 / len(results)
+    report = {"results": len(results), "uncompressed_bytes": len(body)}
+    for name, encode in encoders.items():
+        latencies = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            output = encode()
+            latencies.append((time.perf_counter() - start) * 1000)
+        report[name] = {
+            "p50_ms_per_1k": round(percentile(latencies, 50) * scale, 3),
+            "p95_ms_per_1k": round(percentile(latencies, 95) * scale, 3),
+            "bytes": len(output),
+        }
+    return report
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except Exception:
+        return None
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="TalEnd ingest/search benchmarks")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Synthetic corpus sizes for search")
+    arg_parser.add_argument("--repeats", type=int, default=20, help="Timed runs per query shape")
+    arg_parser.add_argument("--pdf-limit", type=int, default=None, help="Only ingest the first N checked-in PDFs")
+    arg_parser.add_argument("--seed", type=int, default=42)
+    arg_parser.add_argument("--mongo-uri", default=None, help="Use a local MongoDB instead of mongomock")
+    arg_parser.add_argument("--skip-ingest", action="store_true")
+    arg_parser.add_argument("--skip-search", action="store_true")
+    arg_parser.add_argument("--skip-serialization", action="store_true")
+    arg_parser.add_argument("--output", default=None, help="JSON output path (default: benchmarks/results/<timestamp>.json)")
+    args = arg_parser.parse_args(argv)
+
+    db = install_stubs(args.mongo_uri)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": "mongodb" if args.mongo_uri else "mongomock",
+            "sizes": args.sizes,
+            "repeats": args.repeats,
+            "seed": args.seed,
+        }
+    }
+    if not args.skip_ingest:
+        report["ingest"] = bench_ingest(db, args.pdf_limit)
+    if not args.skip_search:
+        report["search"] = bench_search(db, args.sizes, args.repeats, args.seed)
+    if not args.skip_serialization:
+        report["serialization"] = bench_serialization(args.repeats, args.seed)
+
+    output = args.output or os.path.join(
+        BACKEND_DIR, "benchmarks", "results", f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Benchmark results written to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Deterministic synthetic CV corpus for benchmarks.
+
+Vocabulary comes from the checked-in skills, titles and universities lists so
+that generated CVs exercise the same matching paths as real resumes.
+"""
+import csv
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+
+from app.utils.experience import normalize_experience
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_NAMES = [
+    "aarav", "aditi", "ananya", "arjun", "deepak", "divya", "ishaan", "kavya", "keshav", "meera",
+    "neha", "nikhil", "pooja", "priya", "rahul", "riya", "rohan", "sahil", "sakshi", "sanjay",
+    "shreya", "shruti", "siddharth", "sneha", "tanvi", "varun", "vikas", "vivek", "yash", "zoya",
+]
+LAST_NAMES = [
+    "agarwal", "bansal", "chawla", "gupta", "iyer", "jain", "kapoor", "khanna", "kumar", "malhotra",
+    "mehta", "menon", "nair", "patel", "rao", "reddy", "sharma", "singh", "verma", "yadav",
+]
+COMPANIES = [
+    "Accenture", "Amazon", "Deloitte", "EY", "Flipkart", "Google", "HDFC Bank", "Infosys", "KPMG",
+    "McKinsey", "Microsoft", "Paytm", "PwC", "Razorpay", "Swiggy", "TCS", "Wipro", "Zomato",
+]
+TAGS = ["finance", "tech", "product", "consulting", "marketing", "sales", "analytics", "operations"]
+DEGREES = ["B.Tech", "B.E.", "B.Com", "BBA", "MBA", "M.Tech", "PGDM", "M.Sc"]
+
+FILLER = (
+    "Led cross-functional initiatives, partnered with stakeholders, improved reporting accuracy "
+    "and delivered projects on schedule while mentoring junior team members."
+).split()
+
+
+def _load_lines(filename: str, limit: int) -> List[str]:
+    with open(os.path.join(BACKEND_DIR, filename), encoding="utf-8-sig") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    return lines[:limit]
+
+
+def _load_universities(limit: int) -> List[str]:
+    with open(os.path.join(BACKEND_DIR, "world-universities.csv"), encoding="utf-8") as f:
+        return [row[1] for row in csv.reader(f) if len(row) > 1 and row[0] == "IN"][:limit] or ["Delhi University"]
+
+
+class SyntheticCorpus:
+    def __init__(self, seed: int = 42, vocabulary_size: int = 5000):
+        self.seed = seed
+        self.skills = _load_lines("LINKEDIN_SKILLS_ORIGINAL.txt", vocabulary_size)
+        self.titles = _load_lines("titles_combined.txt", vocabulary_size)
+        self.universities = _load_universities(vocabulary_size)
+
+    def _raw_text(self, rng: random.Random, doc: Dict, jobs: List[Dict]) -> str:
+        lines = [doc["name"].title(), doc["email"], doc["phone"], "", "EXPERIENCE"]
+        for job in jobs:
+            lines.append(f"{job['title']} | {job['company']} | {job['start']} - {job['end']}")
+            lines.append(" ".join(rng.choice(FILLER) for _ in range(rng.randint(20, 60))))
+        lines += ["", "EDUCATION", doc["last_education"], "", "SKILLS", ", ".join(doc["skills"])]
+        return "\n".join(lines)
+
+    def generate(self, count: int, user_email: str = "bench@example.com") -> Iterator[Dict]:
+        """Yield `count` completed CV documents shaped like parse_cv_task output"""
+        rng = random.Random(self.seed)
+        now = datetime.utcnow()
+        for i in range(count):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            batch = rng.randint(2005, 2024)
+            jobs = []
+            year = batch
+            for _ in range(rng.randint(1, 4)):
+                end = min(year + rng.randint(1, 4), now.year)
+                jobs.append({
+                    "title": rng.choice(self.titles),
+                    "company": rng.choice(COMPANIES),
+                    "start": year,
+                    "end": end,
+                })
+                year = end
+            doc = {
+                "user_email": user_email,
+                "original_filename": f"{first}_{last}_{i}.pdf",
+                "stored_filename": f"synthetic_{i}.pdf",
+                "file_type": "pdf",
+                "upload_time": now - timedelta(days=rng.randint(0, 1000)),
+                "processing_status": "completed",
+                "updated_at": now,
+                "tags": rng.sample(TAGS, rng.randint(0, 2)),
+                "name": f"{first} {last}",
+                "email": f"{first}.{last}{i}@example.com",
+                "phone": f"9{rng.randint(100000000, 999999999)}",
+                "skills": rng.sample(self.skills, rng.randint(5, 25)),
+                "current_company": jobs[-1]["company"],
+                "current_position": jobs[-1]["title"],
+                "last_education": f"{rng.choice(DEGREES)}, {rng.choice(self.universities)}",
+                "graduation_batch": str(batch),
+            }
+            doc["raw_text"] = self._raw_text(rng, doc, jobs)
+            doc.update(normalize_experience(None, doc["raw_text"], now))
+            doc["text_length"] = len(doc["raw_text"])
+            yield doc
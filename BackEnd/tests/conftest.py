@@ -0,0 +1,25 @@
+"""Shared test setup: app imports resolve from BackEnd/ and Mongo is an in-memory mongomock."""
+import os
+import sys
+import types
+
+import mongomock
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+# Same stand-in the benchmarks use (benchmarks/run_benchmarks.py install_stubs)
+_client = mongomock.MongoClient()
+_stub = types.ModuleType("app.db.mongodb")
+_stub.client = _client
+_stub.db = _client["cvtool_test"]
+sys.modules["app.db.mongodb"] = _stub
+
+
+@pytest.fixture
+def db():
+    for name in _stub.db.list_collection_names():
+        _stub.db.drop_collection(name)
+    return _stub.db
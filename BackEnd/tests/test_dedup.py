@@ -0,0 +1,78 @@
+import random
+
+from app.utils.dedup import (
+    compute_minhash, estimate_similarity, index_cv_signature, find_duplicate_clusters, shingles,
+    DUPLICATE_THRESHOLD
+)
+
+WORDS = (
+    "python java sql excel tableau finance audit consulting analyst manager sales marketing "
+    "product strategy operations delivery team client reporting forecasting budgeting"
+).split()
+
+
+def resume_text(seed: int, length: int = 300) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) + str(rng.randint(0, 50)) for _ in range(length))
+
+
+def edit_words(text: str, count: int) -> str:
+    words = text.split()
+    for i in range(count):
+        words[(i * 37) % len(words)] = f"changed{i}"
+    return " ".join(words)
+
+
+def jaccard(a: str, b: str) -> float:
+    sa, sb = shingles(a), shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+def insert_cv(db, text: str, user_email: str = "a@x.com") -> str:
+    return str(db.cvs.insert_one({"user_email": user_email, "raw_text": text}).inserted_id)
+
+
+def test_similarity_estimate_tracks_jaccard():
+    text = resume_text(1)
+    for edits in (0, 5, 20, 60):
+        edited = edit_words(text, edits)
+        estimate = estimate_similarity(compute_minhash(text), compute_minhash(edited))
+        assert abs(estimate - jaccard(text, edited)) < 0.15
+
+
+def test_near_copy_is_recorded_and_unrelated_cv_is_not(db):
+    original = resume_text(1)
+    near_copy = edit_words(original, 3)
+    assert jaccard(original, near_copy) > DUPLICATE_THRESHOLD
+
+    first = insert_cv(db, original)
+    index_cv_signature(db.cvs, first, original, "a@x.com")
+    unrelated = insert_cv(db, resume_text(2))
+    assert index_cv_signature(db.cvs, unrelated, resume_text(2), "a@x.com") == []
+
+    second = insert_cv(db, near_copy)
+    duplicates = index_cv_signature(db.cvs, second, near_copy, "a@x.com")
+    assert [d["cv_id"] for d in duplicates] == [first]
+    assert duplicates[0]["similarity"] >= DUPLICATE_THRESHOLD
+    assert find_duplicate_clusters(db.cvs, "a@x.com") == [sorted([first, second])]
+
+
+def test_pairs_below_the_threshold_are_not_duplicates(db):
+    original = resume_text(1)
+    rewritten = edit_words(original, 60)
+    assert jaccard(original, rewritten) < 0.5
+
+    first = insert_cv(db, original)
+    index_cv_signature(db.cvs, first, original, "a@x.com")
+    second = insert_cv(db, rewritten)
+    assert index_cv_signature(db.cvs, second, rewritten, "a@x.com") == []
+
+
+def test_duplicates_are_only_matched_within_the_same_owner(db):
+    text = resume_text(1)
+    first = insert_cv(db, text, "a@x.com")
+    index_cv_signature(db.cvs, first, text, "a@x.com")
+    other = insert_cv(db, text, "b@x.com")
+
+    assert index_cv_signature(db.cvs, other, text, "b@x.com") == []
+    assert find_duplicate_clusters(db.cvs, "b@x.com") == []
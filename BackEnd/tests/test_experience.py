@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pytest
+
+from app.utils.experience import (
+    parse_stated_experience, months_from_date_ranges, normalize_experience, backfill_experience
+)
+
+NOW = datetime(2025, 6, 15)
+
+
+@pytest.mark.parametrize("stated, months", [
+    (4, 48),
+    (3.5, 42),
+    ("3.5", 42),
+    ("5+ years", 60),
+    ("2 yrs 6 months", 30),
+    ("1 year 3 months", 15),
+    ("8 months", 8),
+    ("Fresher", 0),
+    ("", None),
+    ("see CV", None),
+    (True, None),
+    ("80 years", None),
+])
+def test_parse_stated_experience(stated, months):
+    assert parse_stated_experience(stated) == months
+
+
+def cv_text(*lines: str) -> str:
+    return "\n".join(["Priya Sharma", "WORK EXPERIENCE", *lines, "EDUCATION", "B.Tech 2010 - 2014"])
+
+
+def test_date_range_formats():
+    text = cv_text(
+        "Analyst, Infosys | Jan 2015 - Dec 2016",
+        "Consultant, KPMG | 03/2017 – 08/2018",
+        "Manager, Deloitte | Sept '19 to Present",
+    )
+    # 24 + 18 + (Sep 2019 .. Jun 2025 inclusive = 70)
+    assert months_from_date_ranges(text, NOW) == 112
+
+
+def test_overlapping_jobs_are_counted_once():
+    text = cv_text(
+        "Lead, Amazon | Jan 2018 - Dec 2020",
+        "Advisor (part-time), Startup | Jun 2019 - Jun 2021",
+        "Freelance | 2019 - 2020",
+    )
+    assert months_from_date_ranges(text, NOW) == 42
+
+
+def test_dates_outside_experience_sections_are_ignored():
+    assert months_from_date_ranges("EDUCATION\nB.Tech 2010 - 2014", NOW) is None
+    assert months_from_date_ranges(cv_text("Intern | 2026 - 2027"), NOW) is None
+
+
+def test_stated_experience_wins_over_date_ranges():
+    text = cv_text("Analyst | 2015 - 2020")
+    assert normalize_experience("2 yrs 6 months", text, NOW) == {
+        "total_experience_months": 30, "total_experience_years": 2.5, "experience_source": "stated"
+    }
+    assert normalize_experience(None, text, NOW) == {
+        "total_experience_months": 60, "total_experience_years": 5.0, "experience_source": "date_ranges"
+    }
+    assert normalize_experience("n/a", "no dates", NOW)["experience_source"] is None
+
+
+def test_backfill_only_touches_unnormalized_cvs(db):
+    db.cvs.insert_many([
+        {"processing_status": "completed", "total_experience_years": "4 years", "raw_text": ""},
+        {"processing_status": "completed", "experience_source": "stated", "total_experience_months": 7},
+        {"processing_status": "uploaded", "total_experience_years": "4 years"},
+    ])
+
+    assert backfill_experience(db.cvs) == 1
+    assert sorted(cv.get("total_experience_months") for cv in db.cvs.find({"total_experience_months": {"$ne": None}})) == [7, 48]
@@ -0,0 +1,110 @@
+import importlib
+import sys
+import types
+from datetime import datetime, timedelta
+
+import pytest
+
+
+class FakeTask:
+    def __init__(self):
+        self.sent = []
+
+    def apply_async(self, args, kwargs=None, queue=None):
+        self.sent.append({"cv_id": args[0], "kwargs": kwargs or {}, "queue": queue})
+
+
+@pytest.fixture
+def ingest(db, monkeypatch):
+    """ingest_queue wired to a fake Celery module: tasks are recorded and queue depths come from `depths`"""
+    worker = types.ModuleType("app.celery_worker")
+    worker.INTERACTIVE_QUEUE = "interactive"
+    worker.BULK_QUEUE = "bulk"
+    worker.celery_app = None
+    worker.parse_cv_task = FakeTask()
+    monkeypatch.setitem(sys.modules, "app.celery_worker", worker)
+    monkeypatch.delitem(sys.modules, "app.utils.ingest_queue", raising=False)
+    module = importlib.import_module("app.utils.ingest_queue")
+
+    module.depths = {}
+    monkeypatch.setattr(module, "queue_depth", lambda queue: module.depths.get(queue, 0))
+    module.sent = worker.parse_cv_task.sent
+    yield module
+    sys.modules.pop("app.utils.ingest_queue", None)
+
+
+def add_cvs(db, user_email, count, **fields):
+    now = datetime.utcnow()
+    docs = [
+        {"user_email": user_email, "upload_time": now + timedelta(seconds=i), "stored_filename": f"{user_email}-{i}.pdf", **fields}
+        for i in range(count)
+    ]
+    return [str(cv_id) for cv_id in db.cvs.insert_many(docs).inserted_ids]
+
+
+def test_interactive_admission_counts_only_recent_parses(db, ingest, monkeypatch):
+    monkeypatch.setattr(ingest, "INTERACTIVE_MAX_PER_USER", 3)
+    recent = {"processing_status": "uploaded", "ingest": "interactive", "updated_at": datetime.utcnow()}
+    add_cvs(db, "a@x.com", 2, **recent)
+    assert ingest.interactive_retry_after("a@x.com") is None
+
+    add_cvs(db, "a@x.com", 1, **recent)
+    assert ingest.interactive_retry_after("a@x.com") == ingest.RETRY_AFTER_SECONDS
+    assert ingest.interactive_retry_after("b@x.com") is None
+
+    # Parses that went stale (lost worker) no longer hold the user back
+    db.cvs.update_many({}, {"$set": {"updated_at": datetime.utcnow() - timedelta(seconds=ingest.STALE_PARSE_SECONDS + 60)}})
+    assert ingest.interactive_retry_after("a@x.com") is None
+
+
+def test_interactive_admission_backs_off_when_the_queue_is_deep(db, ingest):
+    ingest.depths["interactive"] = ingest.INTERACTIVE_MAX_DEPTH
+    assert ingest.interactive_retry_after("a@x.com") == ingest.RETRY_AFTER_SECONDS
+
+
+def test_bulk_retry_after_grows_with_the_backlog(db, ingest, monkeypatch):
+    monkeypatch.setattr(ingest, "BULK_MAX_PENDING_PER_USER", 10)
+    monkeypatch.setattr(ingest, "BULK_QUEUE_TARGET", 2)
+    add_cvs(db, "a@x.com", 9, processing_status="queued")
+    # Re-parses of completed CVs are not part of the import backlog
+    add_cvs(db, "a@x.com", 50, processing_status="completed", reparse_pending=True)
+    assert ingest.bulk_retry_after("a@x.com") is None
+
+    add_cvs(db, "a@x.com", 1, processing_status="queued")
+    assert ingest.bulk_retry_after("a@x.com") == ingest.RETRY_AFTER_SECONDS
+
+    add_cvs(db, "a@x.com", 10, processing_status="queued")
+    assert ingest.bulk_retry_after("a@x.com") == 11 * ingest.RETRY_AFTER_SECONDS // 2
+
+
+def test_dispatch_is_round_robin_and_stops_at_the_target(db, ingest, monkeypatch):
+    monkeypatch.setattr(ingest, "BULK_QUEUE_TARGET", 4)
+    big = add_cvs(db, "big@x.com", 10, processing_status="queued")
+    small = add_cvs(db, "small@x.com", 2, processing_status="queued")
+
+    assert ingest.dispatch_bulk_work() == 4
+    assert [task["cv_id"] for task in ingest.sent] == [big[0], small[0], big[1], small[1]]
+    assert all(task["queue"] == "bulk" and task["kwargs"] == {"bulk": True} for task in ingest.sent)
+    assert db.cvs.count_documents({"processing_status": "queued"}) == 8
+
+    # Nothing more goes out while the broker queue is full
+    ingest.depths["bulk"] = 4
+    assert ingest.dispatch_bulk_work() == 0
+
+
+def test_reparses_stay_completed_and_follow_queued_imports(db, ingest):
+    reparse = add_cvs(db, "a@x.com", 1, processing_status="completed", reparse_pending=True)
+    queued = add_cvs(db, "a@x.com", 1, processing_status="queued")
+
+    assert ingest.dispatch_bulk_work() == 2
+    assert [task["cv_id"] for task in ingest.sent] == [queued[0], reparse[0]]
+    claimed = db.cvs.find_one({"processing_status": "completed"})
+    assert claimed["reparse_pending"] is True and claimed["reparse_dispatched_at"]
+
+    # A claimed re-parse is not sent again until it has gone stale
+    assert ingest.dispatch_bulk_work() == 0
+    db.cvs.update_one(
+        {"_id": claimed["_id"]},
+        {"$set": {"reparse_dispatched_at": datetime.utcnow() - timedelta(seconds=ingest.STALE_PARSE_SECONDS + 60)}}
+    )
+    assert ingest.dispatch_bulk_work() == 1
@@ -0,0 +1,40 @@
+import pytest
+
+from app.utils.metrics import Counter, Histogram, Metric, REGISTRY
+
+
+@pytest.fixture(autouse=True)
+def isolated_registry():
+    registered = list(REGISTRY)
+    yield
+    REGISTRY[:] = registered
+
+
+def test_metric_needs_samples():
+    with pytest.raises(TypeError):
+        Metric("talend_test", "abstract")
+
+
+def test_label_values_are_escaped():
+    counter = Counter("talend_test_total", "Line one\nline two", ["path"])
+    counter.inc(path='C:\\cvs\\"final"\nv2')
+
+    assert counter.render().splitlines() == [
+        "# HELP talend_test_total Line one\\nline two",
+        "# TYPE talend_test_total counter",
+        'talend_test_total{path="C:\\\\cvs\\\\\\"final\\"\\nv2"} 1',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("talend_test_seconds", "Test latency", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value)
+
+    assert histogram.samples() == [
+        'talend_test_seconds_bucket{le="0.1"} 1',
+        'talend_test_seconds_bucket{le="1"} 2',
+        'talend_test_seconds_bucket{le="+Inf"} 3',
+        "talend_test_seconds_sum 5.55",
+        "talend_test_seconds_count 3",
+    ]
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+from app.utils.percolator import (
+    text_grams, keyword_anchor, query_anchors, create_saved_search, percolate_cv
+)
+
+
+def test_anchor_is_the_rarest_gram_of_the_keyword():
+    assert keyword_anchor("python") == "pyt"
+    assert keyword_anchor("c++") == "c++"
+    assert keyword_anchor("py") is None
+    assert keyword_anchor("pythn~1") is None
+
+
+def test_and_queries_anchor_on_their_most_selective_keyword():
+    assert query_anchors("python and excel") == ["pyt"]
+    assert query_anchors("sales and java") == ["jav"]
+    # An unanchorable fuzzy keyword does not stop the others from anchoring the search
+    assert query_anchors("acenture~1 and python") == ["pyt"]
+    assert query_anchors("acenture~1") is None
+
+
+def test_or_queries_need_an_anchor_per_keyword():
+    assert query_anchors("python or java") == ["jav", "pyt"]
+    assert query_anchors("python or acenture~1") is None
+
+
+def test_every_matching_cv_contains_an_anchor():
+    text = "Senior Python developer; Excel and SQL reporting"
+    for query in ("python and excel", "java or sql", "developer"):
+        assert set(query_anchors(query)) & text_grams(text)
+
+
+def insert_cv(db, text, owner="a@x.com", **fields):
+    doc = {
+        "user_email": owner, "raw_text": text, "processing_status": "completed",
+        "upload_time": datetime.utcnow(), "tags": [], **fields
+    }
+    return str(db.cvs.insert_one(doc).inserted_id)
+
+
+def saved_search(db, query, owner="a@x.com", **filters):
+    saved = create_saved_search(db, owner, query, query, filters)
+    db.saved_searches.update_one({"_id": saved["_id"]}, {"$set": {"created_at": datetime.utcnow() - timedelta(days=1)}})
+    return saved["_id"]
+
+
+def inbox(db, search_id):
+    return [str(match["cv_id"]) for match in db.saved_search_matches.find({"search_id": search_id})]
+
+
+def test_percolate_delivers_only_to_matching_searches_of_the_owner(db):
+    python_and_excel = saved_search(db, "python and excel")
+    java = saved_search(db, "java")
+    fuzzy = saved_search(db, "acenture~1")
+    other_owner = saved_search(db, "python", owner="b@x.com")
+
+    cv_id = insert_cv(db, "Python developer at Accenture, advanced Excel")
+    assert percolate_cv(db, cv_id) == 2
+
+    assert inbox(db, python_and_excel) == [cv_id]
+    assert inbox(db, fuzzy) == [cv_id]
+    assert inbox(db, java) == []
+    assert inbox(db, other_owner) == []
+
+
+def test_percolate_applies_experience_filters(db):
+    senior = saved_search(db, "python", exp_min=5)
+    cv_id = insert_cv(db, "python developer", total_experience_months=24)
+
+    percolate_cv(db, cv_id)
+    assert inbox(db, senior) == []
@@ -0,0 +1,107 @@
+import os
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.utils.search_index import SearchIndex, delete_keys, DELETE_PREFIX_LENGTH
+
+
+def new_id() -> str:
+    return str(ObjectId())
+
+
+def test_add_lookup_and_remove():
+    index = SearchIndex()
+    first, second = new_id(), new_id()
+    index.add_document(first, "Senior Python developer at Accenture", {"owner": "a@x.com"})
+    index.add_document(second, "Java developer", {"owner": "b@x.com"})
+
+    assert len(index) == 2
+    assert index.lookup(["developer"]) == {first, second}
+    assert index.lookup(["python"]) == {first}
+    assert index.lookup(["developer"], owners=["b@x.com"]) == {second}
+
+    index.remove_document(first)
+    assert first not in index
+    assert index.lookup(["python"]) == set()
+    assert index.lookup(["developer"]) == {second}
+
+
+def test_re_adding_replaces_terms():
+    index = SearchIndex()
+    cv_id = new_id()
+    index.add_document(cv_id, "python analyst", {"owner": "a@x.com"})
+    index.add_document(cv_id, "golang analyst", {"owner": "a@x.com"})
+
+    assert index.lookup(["python"]) == set()
+    assert index.lookup(["golang"]) == {cv_id}
+    assert len(index) == 1
+
+
+def test_fuzzy_expansion():
+    index = SearchIndex()
+    index.add_document(new_id(), "accenture deloitte", {"owner": "a@x.com"})
+
+    assert index.expand("accenure", 1) == ["accenture"]
+    assert index.expand("acenure", 2) == ["accenture"]
+    assert index.expand("acenure", 1) == []
+    # Short terms are only matched exactly
+    assert index.expand("ey", 2) == []
+
+
+def test_expansion_of_long_terms_past_the_delete_prefix():
+    index = SearchIndex()
+    index.add_document(new_id(), "internationalization", {"owner": "a@x.com"})
+
+    assert index.expand("internationalizaton", 1) == ["internationalization"]
+    assert all(len(key) <= DELETE_PREFIX_LENGTH for key in delete_keys("internationalization", 2))
+
+
+def test_snapshot_and_delta_log_round_trip(tmp_path):
+    index = SearchIndex()
+    index.open(str(tmp_path))
+    kept, removed, late = new_id(), new_id(), new_id()
+    index.add_document(kept, "python accenture", {"owner": "a@x.com", "tags": ["tech"]})
+    index.add_document(removed, "python deloitte", {"owner": "b@x.com"})
+    index.checkpoint(watermark=datetime(2026, 1, 1))
+    index.compact()
+    # After the snapshot: one delete and one add land in the delta log only
+    index.remove_document(removed)
+    index.add_document(late, "golang accenture", {"owner": "a@x.com"})
+    index.checkpoint(watermark=datetime(2026, 1, 2))
+    index.delta_log.close()
+    index._slot_lock.close()
+
+    reopened = SearchIndex()
+    reopened.open(str(tmp_path))
+
+    assert reopened.ready
+    assert reopened.watermark == datetime(2026, 1, 2)
+    assert reopened.doc_ids() == {kept, late}
+    assert reopened.lookup(["accenture"], owners=["a@x.com"]) == {kept, late}
+    assert reopened.lookup(["python"]) == {kept}
+    assert reopened.expand("acenture", 1) == ["accenture"]
+    assert reopened.get_meta(kept)["tags"] == ["tech"]
+
+
+def test_processes_sharing_a_directory_get_separate_slots(tmp_path):
+    first, second = SearchIndex(), SearchIndex()
+    first.open(str(tmp_path))
+    second.open(str(tmp_path))
+
+    assert first.directory != second.directory
+    assert os.path.dirname(first.directory) == os.path.dirname(second.directory) == str(tmp_path)
+
+
+def test_log_without_snapshot_is_not_trusted(tmp_path):
+    index = SearchIndex()
+    index.open(str(tmp_path))
+    index.add_document(new_id(), "python", {"owner": "a@x.com"})
+    index.checkpoint(watermark=datetime(2026, 1, 1))
+    index.delta_log.close()
+    index._slot_lock.close()
+
+    reopened = SearchIndex()
+    reopened.open(str(tmp_path))
+    assert not reopened.ready
+    assert len(reopened) == 0
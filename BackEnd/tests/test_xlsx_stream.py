@@ -0,0 +1,40 @@
+import io
+
+import pytest
+
+from app.utils.xlsx_stream import stream_xlsx, column_letter
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+def read_workbook(chunks):
+    return openpyxl.load_workbook(io.BytesIO(b"".join(chunks)), read_only=True)
+
+
+def test_column_letters():
+    assert [column_letter(i) for i in (0, 25, 26, 701, 702)] == ["A", "Z", "AA", "ZZ", "AAA"]
+
+
+def test_output_opens_in_openpyxl():
+    header = ["Name", "Experience", "Skills"]
+    rows = [["Priya <Sharma> & Co", 4.5, "python, sql"], ["Rahul", 12, None], ["Tab\x0bbed", float("nan"), True]]
+
+    workbook = read_workbook(stream_xlsx(header, rows, sheet_name="CV \"Export\""))
+
+    assert workbook.sheetnames == ['CV "Export"']
+    values = [list(row) for row in workbook.active.iter_rows(values_only=True)]
+    assert values[0] == header
+    assert values[1] == ["Priya <Sharma> & Co", 4.5, "python, sql"]
+    # None is an empty string; illegal XML characters are dropped; NaN and booleans are written as text
+    assert values[2] == ["Rahul", 12, ""]
+    assert values[3] == ["Tabbed", "nan", "True"]
+
+
+def test_rows_are_streamed_in_chunks():
+    rows = ([f"candidate {i}", i, "x" * 200] for i in range(5000))
+    chunks = list(stream_xlsx(["Name", "Number", "Notes"], rows, flush_rows=100))
+
+    assert len(chunks) > 2
+    values = list(read_workbook(chunks).active.iter_rows(values_only=True))
+    assert len(values) == 5001
+    assert values[-1] == ("candidate 4999", 4999, "x" * 200)